@@ -0,0 +1,384 @@
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from config import Config
+from profiler import Profiler
+from simulation import Simulation, make_input
+from entities import PhysicsBatch
+from replay import state_digest
+
+# Cenários registrados: nome -> (função de preparo, ticks)
+# A função de preparo recebe a simulação já criada e devolve input_fn(sim, tick).
+SCENARIOS = {}
+
+def scenario(name, ticks):
+    def register(fn):
+        SCENARIOS[name] = (fn, ticks)
+        return fn
+    return register
+
+@scenario("climb", 2500)
+def climb(sim):
+    """Sobe 50 chunks: o player é içado a cada tick enquanto corre e pula."""
+    target_y = sim.map_system.base_y - 50 * Config.CHUNK_HEIGHT
+    def inputs(sim, tick):
+        p = sim.active_player
+        if p.pos.y > target_y:
+            p.pos.y -= 12; p.rect.y = int(p.pos.y); p.vel.y = min(p.vel.y, 0)
+        return make_input(left=tick % 200 < 100, right=tick % 200 >= 100, jump=tick % 25 == 0,
+                          mouse_world=(p.pos.x, p.pos.y - 200))
+    return inputs
+
+@scenario("grenades", 1200)
+def grenades(sim):
+    """Granadas sem cooldown em leque: tempestade de Projectile + ParticleManager.emit."""
+    def inputs(sim, tick):
+        p = sim.active_player
+        p.shoot_cooldown = 0
+        angle = -math.pi / 2 + math.sin(tick * 0.1) * 1.2
+        aim = (p.pos.x + math.cos(angle) * 200, p.pos.y + math.sin(angle) * 200)
+        return make_input(weapon2=tick == 0, shoot=True, mouse_world=aim)
+    return inputs
+
+@scenario("rifle", 1200)
+def rifle(sim):
+    """Rifle do DUMMY rebatendo no funil estreito perto do chão."""
+    sim.active_player = sim.spawn_dummy(0, sim.map_system.base_y - 60)
+    def inputs(sim, tick):
+        p = sim.active_player
+        p.shoot_cooldown = 0
+        angle = -math.pi / 2 + math.sin(tick * 0.05) * 1.4
+        aim = (p.pos.x + math.cos(angle) * 200, p.pos.y + math.sin(angle) * 200)
+        return make_input(weapon2=tick == 0, shoot=True, mouse_world=aim)
+    return inputs
+
+@scenario("hook_swing", 1500)
+def hook_swing(sim):
+    """BLUE engancha o DUMMY e balança: física mútua do gancho."""
+    dummy = sim.spawn_dummy(150, sim.map_system.base_y - 300)
+    def inputs(sim, tick):
+        return make_input(left=tick % 180 < 90, right=tick % 180 >= 90, jump=tick % 45 == 0,
+                          hook=tick % 90 < 70, mouse_world=(dummy.rect.centerx, dummy.rect.centery))
+    return inputs
+
+@scenario("long_fall", 1500)
+def long_fall(sim):
+    """Queda longa: o mapa é gerado bem alto e o player cai até pousar."""
+    for _ in range(15): sim.map_system.generate_chunk()
+    p = sim.active_player
+    p.pos.update(0, sim.map_system.highest_point + 200)
+    p.rect.topleft = (int(p.pos.x), int(p.pos.y))
+    def inputs(sim, tick):
+        return make_input(left=tick % 300 < 20, right=150 <= tick % 300 < 170)
+    return inputs
+
+@scenario("crowd", 1000)
+def crowd(sim):
+    """Sala de treino com 200 DUMMYs empilhados: granadas, martelo e gancho na multidão."""
+    base_y = sim.map_system.base_y
+    for i in range(200):
+        sim.spawn_dummy(-260 + (i % 14) * 40, base_y - 60 - (i // 14) * 40)
+    sim.active_player = sim.player_blue
+    def inputs(sim, tick):
+        p = sim.active_player
+        p.shoot_cooldown = 0 if tick % 10 == 0 else p.shoot_cooldown
+        angle = -math.pi / 2 + math.sin(tick * 0.07) * 1.4
+        aim = (p.pos.x + math.cos(angle) * 200, p.pos.y + math.sin(angle) * 200)
+        return make_input(left=tick % 160 < 80, right=tick % 160 >= 80, jump=tick % 40 == 0, shoot=True,
+                          weapon1=tick % 300 == 0, weapon2=tick % 300 == 150, hook=tick % 120 < 60, mouse_world=aim)
+    return inputs
+
+def spread_dummies(sim, count):
+    """Um DUMMY em cima de cada bloco sorteado: corpos espalhados pelas plataformas."""
+    rng = random.Random(count)
+    tops = [w for w in sim.map_system.walls if not sim.map_system.is_solid(w.x, w.y - 1)]
+    for wall in rng.sample(tops, min(count, len(tops))):
+        sim.spawn_dummy(wall.x + 5, wall.y - 31)
+    sim.active_player = sim.player_blue
+
+@scenario("stress", 600)
+def stress(sim):
+    """Sala de estresse: 300 DUMMYs espalhados pelas plataformas, granadas caindo entre eles."""
+    for _ in range(10): sim.map_system.generate_chunk()
+    spread_dummies(sim, 300)
+    return grenades(sim)
+
+@scenario("stress_batch", 600)
+def stress_batch(sim):
+    """O mesmo que 'stress', com a física das paredes em lote (PhysicsBatch)."""
+    sim.batch = PhysicsBatch()
+    return stress(sim)
+
+class GCMonitor:
+    """Conta as coletas do GC e soma as pausas enquanto está ativo (gc.callbacks)."""
+    def __init__(self):
+        self.collections = 0
+        self.pause = 0.0
+        self.max_pause = 0.0
+        self.start = 0.0
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.start = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self.start
+            self.collections += 1
+            self.pause += pause
+            self.max_pause = max(self.max_pause, pause)
+
+    def __enter__(self):
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self)
+        return False
+
+    def result(self):
+        return {'collections': self.collections, 'pause_ms': self.pause * 1000, 'max_pause_ms': self.max_pause * 1000}
+
+def run_scenario(name, seed=0, render=False, measure_memory=False):
+    setup, ticks = SCENARIOS[name]
+    random.seed(seed)
+    if measure_memory: tracemalloc.start()
+    profiler = Profiler(history=ticks)
+    profiler.enabled = not measure_memory
+    sim = Simulation(profiler)
+    input_fn = setup(sim)
+
+    surface = None
+    if render:
+        import pygame
+        surface = pygame.Surface((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+
+    with GCMonitor() as gc_monitor:
+        start = time.perf_counter()
+        for tick in range(ticks):
+            sim.step(input_fn(sim, tick))
+            if surface is not None:
+                surface.fill(Config.COLOR_BG)
+                sim.draw(surface)
+            profiler.end_frame()
+        elapsed = time.perf_counter() - start
+
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {'peak_kb': peak / 1024}
+
+    stages = {}
+    for stage, samples in profiler.samples.items():
+        stages[stage] = {'mean_ms': sum(samples) / len(samples), 'p95_ms': profiler.percentiles(stage)[1]}
+    return {'ticks': ticks, 'ticks_per_sec': ticks / elapsed, 'stages': stages, 'counts': sim.counts(),
+            'gc': gc_monitor.result()}
+
+# Orçamento de alocação por tick (bytes de pico transitório no span "players")
+ALLOC_BUDGETS = {'hook_swing': 1024, 'climb': 1024, 'crowd': 8192}
+
+class _AllocSpan:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exc):
+        peak = tracemalloc.get_traced_memory()[1]
+        self.profiler.samples.setdefault(self.name, []).append(peak - self.start)
+        return False
+
+class AllocProfiler:
+    """
+    Troca o tempo pelo pico de memória dentro de cada span (tracemalloc): quanto o
+    subsistema aloca de uma vez por tick. Os spans da simulação não se aninham.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.samples = {}
+
+    def span(self, name): return _AllocSpan(self, name)
+    def end_frame(self, counts=None): pass
+
+def measure_allocations(name, seed=0, warmup=100, ticks=300):
+    """Média de bytes transitórios por tick em cada span, depois do aquecimento."""
+    setup, _ = SCENARIOS[name]
+    random.seed(seed)
+    profiler = AllocProfiler()
+    sim = Simulation(profiler)
+    input_fn = setup(sim)
+    for tick in range(warmup): sim.step(input_fn(sim, tick))
+    profiler.samples.clear()
+    tracemalloc.start()
+    try:
+        for tick in range(warmup, warmup + ticks): sim.step(input_fn(sim, tick))
+    finally:
+        tracemalloc.stop()
+    return {span: sum(v) / len(v) for span, v in profiler.samples.items()}
+
+def check_allocations(seed=0):
+    """Confere ALLOC_BUDGETS; retorna a lista de estouros (textos)."""
+    failures = []
+    for name, budget in ALLOC_BUDGETS.items():
+        spans = measure_allocations(name, seed)
+        used = spans.get('players', 0.0)
+        print(f"{name:<12} players {used:7.0f} B/tick (orçamento {budget} B) | "
+              + " ".join(f"{span} {b:.0f}" for span, b in spans.items() if span != 'players'))
+        if used > budget: failures.append(f"{name}: {used:.0f} B/tick no span players (orçamento {budget} B)")
+    return failures
+
+def check_rollback(seed=0, warmup=200, span=100):
+    """
+    Para cada cenário: roda 'span' ticks, volta ao início deles pelo histórico e roda de novo.
+    O estado final tem de ser o mesmo (state_digest). Mede também o custo de snapshot/restore.
+    As funções de entrada dos cenários mexem no estado, então são chamadas de novo (mesmo tick, mesmo efeito).
+    """
+    failures = []
+    for name in ('grenades', 'rifle', 'hook_swing', 'crowd'):
+        setup, _ = SCENARIOS[name]
+        random.seed(seed)
+        sim = Simulation(history=span + 1)
+        input_fn = setup(sim)
+        for tick in range(warmup): sim.step(input_fn(sim, tick))
+        start = sim.tick
+        for tick in range(warmup, warmup + span): sim.step(input_fn(sim, tick))
+        expected = state_digest(sim)
+
+        t0 = time.perf_counter()
+        for _ in range(100): snapshot = sim.snapshot()
+        t1 = time.perf_counter()
+        sim.rollback(start)
+        t2 = time.perf_counter()
+        for tick in range(warmup, warmup + span): sim.step(input_fn(sim, tick))
+        ok = state_digest(sim) == expected
+        print(f"{name:<12} {'confere' if ok else 'DIVERGIU':<9} snapshot {(t1 - t0) * 1e4:7.1f} us | "
+              f"rollback {(t2 - t1) * 1e6:7.1f} us | {len(snapshot[1])} players")
+        if not ok: failures.append(f"{name}: estado diferente depois do rollback de {span} ticks")
+    return failures
+
+def check_entity_grid(seed=0):
+    """
+    Roda os cenários cheios duas vezes: com a broadphase padrão (varredura dos rects, até
+    ENTITY_GRID_MIN entidades) e forçando as células (grid_min=0). O estado final tem de ser o mesmo.
+    """
+    failures = []
+    for name in ('crowd', 'stress', 'stress_batch'):
+        setup, ticks = SCENARIOS[name]
+        digests, elapsed = [], []
+        for grid_min in (Config.ENTITY_GRID_MIN, 0):
+            random.seed(seed)
+            sim = Simulation()
+            sim.entities.grid_min = grid_min
+            input_fn = setup(sim)
+            start = time.perf_counter()
+            for tick in range(ticks): sim.step(input_fn(sim, tick))
+            elapsed.append(time.perf_counter() - start)
+            digests.append(state_digest(sim))
+        cells = sim.entities.use_cells
+        ok = digests[0] == digests[1] and cells
+        print(f"{name:<12} {'confere' if ok else 'DIVERGIU':<9} varredura {elapsed[0]:6.2f}s | "
+              f"células {elapsed[1]:6.2f}s | {len(sim.players)} players")
+        if not cells: failures.append(f"{name}: grid_min=0 não usou as células")
+        elif not ok: failures.append(f"{name}: estado diferente com as células da broadphase")
+    return failures
+
+def run_all(names, seed, render, repeat=3):
+    results = {}
+    for name in names:
+        # Melhor de 'repeat' execuções: a mesma semente dá a mesma carga, só o ruído muda
+        result = max((run_scenario(name, seed, render) for _ in range(repeat)), key=lambda r: r['ticks_per_sec'])
+        result.update(run_scenario(name, seed, render, measure_memory=True))
+        results[name] = result
+    return results
+
+def compare(results, baseline, threshold):
+    """Retorna a lista de regressões (textos) contra o baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base: continue
+        if result['ticks_per_sec'] < base['ticks_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: {result['ticks_per_sec']:.0f} ticks/s (baseline {base['ticks_per_sec']:.0f})")
+        if result['peak_kb'] > base['peak_kb'] * (1 + threshold):
+            regressions.append(f"{name}: pico {result['peak_kb']:.0f} KiB (baseline {base['peak_kb']:.0f})")
+    return regressions
+
+def print_report(results):
+    for name, result in results.items():
+        print(f"\n== {name}: {result['ticks_per_sec']:.0f} ticks/s | pico de memória {result['peak_kb']:.0f} KiB | {result['counts']}")
+        g = result['gc']
+        print(f"   GC: {g['collections']} coletas, {g['pause_ms']:.2f} ms no total, pausa máxima {g['max_pause_ms']:.2f} ms")
+        for stage, t in sorted(result['stages'].items(), key=lambda kv: -kv[1]['mean_ms']):
+            print(f"   {stage:<18} média {t['mean_ms']:.4f} ms   p95 {t['p95_ms']:.4f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks determinísticos com cenários roteirizados")
+    parser.add_argument("scenarios", nargs="*", help=f"cenários ({', '.join(SCENARIOS)}); padrão: todos")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--render", action="store_true", help="inclui o desenho (driver de vídeo dummy)")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="grava os resultados como novo baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por cenário (vale a mais rápida)")
+    parser.add_argument("--threshold", type=float, default=0.15, help="regressão tolerada (fração)")
+    parser.add_argument("--json", help="grava os resultados completos neste arquivo")
+    parser.add_argument("--check-alloc", action="store_true",
+                        help="só confere o orçamento de alocação por tick (ALLOC_BUDGETS) e sai")
+    parser.add_argument("--check-rollback", action="store_true",
+                        help="só confere se o rollback pelo histórico de snapshots reproduz o estado, e sai")
+    parser.add_argument("--check-entity-grid", action="store_true",
+                        help="só confere se as células da broadphase dão o mesmo estado que a varredura, e sai")
+    args = parser.parse_args(argv)
+
+    if args.check_alloc:
+        failures = check_allocations(args.seed)
+        for f in failures: print("  ESTOURO: " + f)
+        return 1 if failures else 0
+    if args.check_rollback:
+        failures = check_rollback(args.seed)
+        for f in failures: print("  FALHA: " + f)
+        return 1 if failures else 0
+    if args.check_entity_grid:
+        failures = check_entity_grid(args.seed)
+        for f in failures: print("  FALHA: " + f)
+        return 1 if failures else 0
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS: parser.error(f"cenário desconhecido: {name}")
+    if args.render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    results = run_all(names, args.seed, args.render, args.repeat)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+        print(f"\nbaseline gravado em {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nREGRESSÕES:")
+            for r in regressions: print("  " + r)
+            return 1
+        print(f"\nsem regressões contra {args.baseline} (limite {args.threshold:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
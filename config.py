@@ -3,7 +3,9 @@ import pygame
 class Config:
     SCREEN_WIDTH = 1280
     SCREEN_HEIGHT = 720
-    FPS = 60
+    FPS = 60                   # Limite de quadros desenhados por segundo
+    SIM_HZ = 60                # Ticks de simulação por segundo (passo fixo)
+    MAX_SUBSTEPS = 5           # Máximo de ticks por quadro (evita a espiral da morte)
     TITLE = "Project Teeworlds: Tag Team & Ricochet"
     
     # Cores
@@ -27,6 +29,7 @@ class Config:
     # Física
     GRAVITY = 0.5
     TERMINAL_VELOCITY = 20.0
+    SWEEP_MIN_SPEED = 20.0     # Acima disso (px/tick) o corpo usa colisão contínua
     FRICTION_GROUND = 0.85
     FRICTION_AIR = 0.96
     
@@ -65,10 +68,68 @@ class Config:
     RIFLE_FORCE = 15.0         # Força de empurrão/puxão
     RIFLE_RANGE = 800
     
+    # Cache de sprites (corpo, arma e olhos do player)
+    SPRITE_CACHE_SIZE = 512
+    SPRITE_SCALE_STEP = 0.05   # Quantização de scale_x/scale_y
+    SPRITE_ANGLE_STEP = 2      # Quantização de ângulos (graus)
+    TEXT_CACHE_SIZE = 256      # Textos renderizados guardados (menus, HUD, overlay)
+    STARTUP_TARGET_MS = 200    # Meta de tempo até o primeiro quadro (--startup-report)
+
+    # Profiler
+    PROFILER_HISTORY = 300          # Quadros guardados para os percentis
+    PROFILER_EXPORT_PATH = "profile.jsonl"
+
+    # Partículas
+    PARTICLE_CAPACITY = 32768
+
+    # Qualidade (valores atuais dos botões; o QualityGovernor troca pelos de um preset)
+    PARTICLE_EMIT_SCALE = 1.0  # Fração das partículas pedidas que de fato nascem
+    PARTICLE_LIMIT = 32768     # Máximo de partículas vivas (<= PARTICLE_CAPACITY)
+    CAMERA_SHAKE_SCALE = 1.0   # Intensidade do tremor da câmera
+    PLAYER_SQUASH = True       # Inclinação e achatamento do corpo no desenho
+    LASER_TRAIL_SEGMENTS = 4   # Segmentos do rastro do laser desenhados (1 + rebotes)
+    RENDER_SCALE = 1.0         # Resolução do framebuffer do mundo (fração da tela; HUD e menus ficam nativos)
+    RENDER_SMOOTH = False      # Amplia o framebuffer com smoothscale (mais suave, mais caro) em vez de scale
+    QUALITY_LEVELS = ("low", "medium", "high")
+    QUALITY_PRESETS = {
+        "low": {'PARTICLE_EMIT_SCALE': 0.3, 'PARTICLE_LIMIT': 2048, 'CAMERA_SHAKE_SCALE': 0.0,
+                'PLAYER_SQUASH': False, 'LASER_TRAIL_SEGMENTS': 1, 'RENDER_SCALE': 0.5},
+        "medium": {'PARTICLE_EMIT_SCALE': 0.6, 'PARTICLE_LIMIT': 8192, 'CAMERA_SHAKE_SCALE': 0.5,
+                   'PLAYER_SQUASH': True, 'LASER_TRAIL_SEGMENTS': 2, 'RENDER_SCALE': 0.75},
+        "high": {'PARTICLE_EMIT_SCALE': 1.0, 'PARTICLE_LIMIT': 32768, 'CAMERA_SHAKE_SCALE': 1.0,
+                 'PLAYER_SQUASH': True, 'LASER_TRAIL_SEGMENTS': 4, 'RENDER_SCALE': 1.0},
+    }
+    QUALITY = "high"           # Preset inicial
+    QUALITY_ADAPTIVE = True    # O governador ajusta o preset pelo tempo de quadro
+    QUALITY_WINDOW = 60        # Quadros na média móvel do tempo de quadro
+    QUALITY_DOWNGRADE_AT = 0.9   # Média acima disso (fração do orçamento de 1/FPS): baixa um nível
+    QUALITY_UPGRADE_AT = 0.5     # Média abaixo disso por QUALITY_UPGRADE_FRAMES: sobe um nível
+    QUALITY_UPGRADE_FRAMES = 300
+    QUALITY_COOLDOWN = 120     # Quadros sem nova troca depois de uma mudança
+
+    # Entidades
+    ENTITY_CELL_SIZE = 96      # Célula da grade de broadphase entre entidades
+    ENTITY_GRID_MIN = 512      # Até quantas entidades a broadphase só varre os rects (em C)
+    # Física das paredes em lote (NumPy) para salas cheias. ATENÇÃO: muda o resultado da simulação
+    # (todas as ações, depois a física de todos, depois os contatos, em vez de player a player);
+    # replays guardam o modo e são reproduzidos nele
+    BATCH_PHYSICS = False
+    BATCH_PHYSICS_MIN = 32     # Abaixo disso o lote não compensa a cópia para os arrays
+
     # Mapa
     CHUNK_HEIGHT = 600         
+    MAP_EVICT_DISTANCE = 5000  # Chunks mais longe que isso de todos os players são descartados
+    MAP_PREFETCH_DISTANCE = 2400  # Antecipação da geração em segundo plano (px)
+    MAP_PREFETCH_QUEUE = 4     # Máximo de chunks pedidos à thread de uma vez
     PLATFORM_MIN_WIDTH = 3
     PLATFORM_MAX_WIDTH = 8
+    CHUNK_SURFACE_WIDTH = 640  # Largura de cada pedaço pré-renderizado de chunk
+    CHUNK_CACHE_SIZE = 48      # Máximo de pedaços pré-renderizados em memória (LRU)
+
+    # Replay e rollback
+    REPLAY_RECORD = True       # Grava a entrada da partida (salva ao sair)
+    REPLAY_PATH = "last_run.ddr"
+    SNAPSHOT_HISTORY = 120     # Ticks guardados no histórico de rollback (2s a 60Hz)
 
     STATE_MENU = 0
     STATE_GAME = 1
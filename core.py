@@ -1,11 +1,14 @@
 import pygame
 import math
+import threading
+from collections import OrderedDict
 from config import Config
 
 class InputHandler:
     def __init__(self):
         self.mouse_pos = (0, 0)
         self.last_keys = pygame.key.get_pressed()
+        self.actions = {}  # Mesmo dicionário a cada quadro, atualizado no lugar
 
     def process_events(self):
         keys = pygame.key.get_pressed()
@@ -18,29 +21,91 @@ class InputHandler:
         
         self.last_keys = keys
 
-        return {
-            'left': keys[pygame.K_a] or keys[pygame.K_LEFT],
-            'right': keys[pygame.K_d] or keys[pygame.K_RIGHT],
-            'jump': just_pressed_jump,
-            'swap_char': just_pressed_swap, # Tecla X
-            'hook': mouse[2],          
-            'shoot': mouse[0],         
-            'mouse_pos': self.mouse_pos,
-            'weapon1': keys[pygame.K_1], 
-            'weapon2': keys[pygame.K_2]  
-        }
+        actions = self.actions
+        actions['left'] = keys[pygame.K_a] or keys[pygame.K_LEFT]
+        actions['right'] = keys[pygame.K_d] or keys[pygame.K_RIGHT]
+        actions['jump'] = just_pressed_jump
+        actions['swap_char'] = just_pressed_swap # Tecla X
+        actions['hook'] = mouse[2]
+        actions['shoot'] = mouse[0]
+        actions['mouse_pos'] = self.mouse_pos
+        actions['weapon1'] = keys[pygame.K_1]
+        actions['weapon2'] = keys[pygame.K_2]
+        return actions
+
+class TextRenderer:
+    """
+    Fontes carregadas uma vez só (SysFont varre as fontes do sistema a cada chamada)
+    e cache LRU das superfícies de texto por (fonte, texto, cor): texto repetido custa um blit.
+    Até use_system_fonts(), desenha com a fonte embutida do pygame, que não precisa da varredura.
+    """
+    def __init__(self, capacity=Config.TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.fonts = {}            # (nome, tamanho, negrito) -> Font
+        self.cache = OrderedDict()  # (fonte, texto, cor) -> Surface, em ordem LRU
+        self.loader = None
+        self.system_fonts = False  # False: fonte embutida (primeiro quadro sem esperar a varredura)
+
+    def preload(self):
+        # A varredura das fontes do sistema (fc-list etc.) roda numa thread enquanto o menu aparece
+        self.loader = threading.Thread(target=pygame.font.get_fonts, name="font-scan", daemon=True)
+        self.loader.start()
+
+    def use_system_fonts(self):
+        # Troca para SysFont: espera a varredura e descarta o que foi feito com a fonte embutida
+        if self.loader: self.loader.join(); self.loader = None
+        self.system_fonts = True
+        self.fonts.clear()
+        self.cache.clear()
+
+    def font(self, size, bold=False, name="arial"):
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            if self.system_fonts:
+                font = pygame.font.SysFont(name, size, bold=bold)
+            else:
+                font = pygame.font.Font(None, size)
+                font.set_bold(bold)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, size, color, bold=False, name="arial"):
+        key = ((name, size, bold), text, color)
+        surf = self.cache.get(key)
+        if surf is not None:
+            self.cache.move_to_end(key)
+            return surf
+        surf = self.cache[key] = self.font(size, bold, name).render(text, True, color)
+        if len(self.cache) > self.capacity: self.cache.popitem(last=False)
+        return surf
 
 class Camera:
     def __init__(self):
         self.offset = pygame.math.Vector2(0, 0)
+        self.prev_offset = pygame.math.Vector2(0, 0)  # Offset no tick anterior (interpolação)
         self.shake_timer = 0
         self.shake_magnitude = 0
+        self.scale = 1.0  # Escala do desenho (framebuffer menor que a tela); a simulação usa sempre 1
+
+    def snapshot(self):
+        return (self.offset.x, self.offset.y, self.prev_offset.x, self.prev_offset.y, self.shake_timer, self.shake_magnitude)
+
+    def restore(self, state):
+        self.offset.update(state[0], state[1]); self.prev_offset.update(state[2], state[3])
+        self.shake_timer, self.shake_magnitude = state[4], state[5]
 
     def trigger_shake(self, magnitude, duration):
         self.shake_magnitude = magnitude
         self.shake_timer = duration
 
+    def interpolate(self, other, alpha):
+        # Posiciona esta câmera entre o tick anterior e o atual de 'other'
+        self.offset.update(other.prev_offset.lerp(other.offset, alpha))
+
     def update(self, target_pos):
+        self.prev_offset.update(self.offset)
+
         # Interpolação suave para seguir o alvo
         target_x = target_pos.x - Config.SCREEN_WIDTH // 2
         target_y = target_pos.y - Config.SCREEN_HEIGHT // 2
@@ -51,21 +116,26 @@ class Camera:
         if self.shake_timer > 0:
             self.shake_timer -= 1
             import random
-            self.offset.x += random.randint(-self.shake_magnitude, self.shake_magnitude)
-            self.offset.y += random.randint(-self.shake_magnitude, self.shake_magnitude)
+            # A qualidade só escala o deslocamento sorteado: os sorteios (e o 'random' global) não mudam
+            self.offset.x += random.randint(-self.shake_magnitude, self.shake_magnitude) * Config.CAMERA_SHAKE_SCALE
+            self.offset.y += random.randint(-self.shake_magnitude, self.shake_magnitude) * Config.CAMERA_SHAKE_SCALE
 
     def apply_rect(self, rect):
-        return pygame.Rect(rect.x - self.offset.x, rect.y - self.offset.y, rect.width, rect.height)
+        s = self.scale
+        return pygame.Rect((rect.x - self.offset.x) * s, (rect.y - self.offset.y) * s, rect.width * s, rect.height * s)
     
     def apply_point(self, point):
-        return (point[0] - self.offset.x, point[1] - self.offset.y)
+        return ((point[0] - self.offset.x) * self.scale, (point[1] - self.offset.y) * self.scale)
     
-    def to_world(self, pos):
-        return pygame.math.Vector2(pos[0] + self.offset.x, pos[1] + self.offset.y)
+    def to_world(self, pos, out=None):
+        # Com 'out', escreve no Vector2 dado em vez de alocar um novo
+        if out is None: return pygame.math.Vector2(pos[0] + self.offset.x, pos[1] + self.offset.y)
+        out.update(pos[0] + self.offset.x, pos[1] + self.offset.y)
+        return out
 
 class MathUtils:
     @staticmethod
-    def raycast_bounce(start_pos, direction, walls, entities, max_bounces=3):
+    def raycast_bounce(start_pos, direction, world, entities, max_bounces=3):
         """
         Calcula a trajetória de um laser que rebate.
         Retorna uma lista de tuplas: (ponto_inicial, ponto_final, entidade_atingida_se_houver)
@@ -82,39 +152,20 @@ class MathUtils:
             hit_normal = pygame.math.Vector2(0, 0)
             hit_entity = None
             
-            # 1. Raycast contra Paredes (Cálculo simplificado de AABB)
+            # 1. Raycast contra Paredes (travessia exata da grade de blocos)
             end_pos = current_start + current_dir * remaining_dist
-            test_line = (current_start, end_pos)
-            
-            # Verificação passo-a-passo (Raymarching simples para colisão precisa)
-            step_size = 10
-            steps = int(closest_dist / step_size)
-            
-            collision_found = False
-            for i in range(steps):
-                check_point = current_start + current_dir * (i * step_size)
-                check_rect = pygame.Rect(check_point.x, check_point.y, 4, 4)
-                
-                for w in walls:
-                    if w.colliderect(check_rect):
-                        closest_hit = check_point
-                        closest_dist = i * step_size
-                        
-                        # Determinar Normal (qual lado bateu?)
-                        dx = (check_point.x - w.centerx) / (w.width / 2)
-                        dy = (check_point.y - w.centery) / (w.height / 2)
-                        if abs(dx) > abs(dy):
-                            hit_normal = pygame.math.Vector2(1 if dx > 0 else -1, 0)
-                        else:
-                            hit_normal = pygame.math.Vector2(0, 1 if dy > 0 else -1)
-                        collision_found = True
-                        break
-                if collision_found: break
+            wall_hit = world.raycast(current_start, current_dir, remaining_dist)
+            if wall_hit:
+                closest_dist, point, normal = wall_hit
+                closest_hit = pygame.math.Vector2(point)
+                hit_normal = pygame.math.Vector2(normal)
 
             # 2. Raycast contra Entidades (Só se não bateu na parede antes)
-            for ent in entities:
+            # (a broadphase devolve, na ordem da lista, só quem o segmento corta)
+            seg_end = current_start + current_dir * closest_dist
+            for ent in entities.query_segment(current_start, seg_end):
                 # Checa intersecção linha-retângulo
-                clipline = ent.rect.clipline(current_start, current_start + current_dir * closest_dist)
+                clipline = ent.rect.clipline(current_start, seg_end)
                 if clipline:
                     closest_hit = pygame.math.Vector2(clipline[0])
                     closest_dist = current_start.distance_to(closest_hit)
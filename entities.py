@@ -3,24 +3,46 @@ import math
 import random
 from config import Config
 from core import MathUtils
-from entities_physics import PhysicsEntity, ParticleManager 
+from entities_physics import PhysicsEntity, ParticleManager, EntityGrid, PhysicsBatch, swept_aabb, swept_point
 import entities_draw 
 
 # Re-exporta ParticleManager para compatibilidade com o main.py
-__all__ = ['Player', 'Projectile', 'ParticleManager', 'PhysicsEntity']
+__all__ = ['Player', 'Projectile', 'ProjectilePool', 'ParticleManager', 'PhysicsEntity', 'EntityGrid', 'PhysicsBatch']
 
 class Projectile:
+    __slots__ = ('pos', 'prev_pos', 'vel', 'rect', 'particles', 'life', 'active')
+
     def __init__(self, x, y, angle, particles):
-        self.pos = pygame.math.Vector2(x, y)
-        self.vel = pygame.math.Vector2(math.cos(angle), math.sin(angle)) * Config.GRENADE_SPEED
-        self.rect = pygame.Rect(x, y, 12, 12)
+        self.pos = pygame.math.Vector2()
+        self.prev_pos = pygame.math.Vector2()
+        self.vel = pygame.math.Vector2()
+        self.rect = pygame.Rect(0, 0, 12, 12)
+        self.reset(x, y, angle, particles)
+
+    def reset(self, x, y, angle, particles):
+        # Reaproveita os Vector2/Rect: é assim que o pool devolve um projétil "novo"
+        self.pos.update(x, y)
+        self.prev_pos.update(x, y)
+        self.vel.update(math.cos(angle) * Config.GRENADE_SPEED, math.sin(angle) * Config.GRENADE_SPEED)
+        self.rect.update(x, y, 12, 12)
         self.particles = particles
         self.life = Config.GRENADE_LIFETIME
         self.active = True
 
-    def update(self, walls, entities):
+    def snapshot(self):
+        p, pp, v = self.pos, self.prev_pos, self.vel
+        return (p.x, p.y, pp.x, pp.y, v.x, v.y, self.rect.x, self.rect.y, self.life, self.particles)
+
+    def restore(self, state):
+        self.pos.update(state[0], state[1]); self.prev_pos.update(state[2], state[3])
+        self.vel.update(state[4], state[5]); self.rect.topleft = (state[6], state[7])
+        self.life = state[8]; self.particles = state[9]; self.active = True
+
+    def update(self, world, entities):
         self.vel.y += Config.GRAVITY
-        self.pos += self.vel
+        # Colisão contínua: a granada para no ponto de impacto em vez de atravessar blocos finos
+        hit = swept_aabb(world, self.rect, self.vel)
+        self.pos += self.vel * hit[0] if hit else self.vel
         self.rect.topleft = (int(self.pos.x), int(self.pos.y))
         
         if random.random() < 0.3:
@@ -30,26 +52,81 @@ class Projectile:
         if self.life <= 0:
             self.explode(entities); return
 
-        for w in walls:
-            if self.rect.colliderect(w): self.explode(entities); return
+        if hit or world.overlaps(self.rect): self.explode(entities); return
 
     def explode(self, entities):
         self.active = False
         self.particles.emit(self.pos, 20, Config.COLOR_EXPLOSION, 8)
         blast_center = self.pos
-        for entity in entities:
-            if isinstance(entity, PhysicsEntity):
-                dist_vec = entity.pos - blast_center
-                dist = dist_vec.length()
-                if dist < Config.GRENADE_BLAST_RADIUS:
-                    force_factor = (Config.GRENADE_BLAST_RADIUS - dist) / Config.GRENADE_BLAST_RADIUS
-                    direction = dist_vec.normalize() if dist > 0 else pygame.math.Vector2(0, -1)
-                    entity.vel += direction * (Config.GRENADE_BLAST_FORCE * force_factor)
-
-    def draw(self, surface, camera):
-        entities_draw.draw_projectile(surface, camera, self)
+        for entity in entities.query_radius(blast_center, Config.GRENADE_BLAST_RADIUS):
+            dist_vec = entity.pos - blast_center
+            dist = dist_vec.length()
+            if dist < Config.GRENADE_BLAST_RADIUS:
+                force_factor = (Config.GRENADE_BLAST_RADIUS - dist) / Config.GRENADE_BLAST_RADIUS
+                direction = dist_vec.normalize() if dist > 0 else pygame.math.Vector2(0, -1)
+                entity.vel += direction * (Config.GRENADE_BLAST_FORCE * force_factor)
+
+    def draw(self, surface, camera, alpha=1.0):
+        entities_draw.draw_projectile(surface, camera, self, alpha)
+
+class ProjectilePool:
+    """
+    Projéteis vivos + lista livre. spawn() reaproveita um morto antes de criar outro;
+    update() compacta os vivos no lugar (mesma ordem, O(n) por tick) e devolve os
+    mortos à lista livre, sem o remove() O(n) por projétil nem lixo para o GC.
+    Iterar o pool percorre só os vivos.
+    """
+    __slots__ = ('active', 'free')
+
+    def __init__(self):
+        self.active = []
+        self.free = []
+
+    def __iter__(self): return iter(self.active)
+    def __len__(self): return len(self.active)
+
+    def spawn(self, x, y, angle, particles):
+        if self.free:
+            proj = self.free.pop()
+            proj.reset(x, y, angle, particles)
+        else:
+            proj = Projectile(x, y, angle, particles)
+        self.active.append(proj)
+        return proj
+
+    def update(self, world, entities):
+        active = self.active
+        keep = 0
+        for i in range(len(active)):
+            proj = active[i]
+            proj.update(world, entities)
+            if proj.active:
+                active[keep] = proj; keep += 1
+            else:
+                self.free.append(proj)
+        del active[keep:]
+
+    def clear(self):
+        self.free.extend(self.active)
+        self.active.clear()
+
+    def snapshot(self):
+        return tuple(proj.snapshot() for proj in self.active)
+
+    def restore(self, state):
+        # Os vivos voltam para a lista livre e são reaproveitados na ordem do snapshot
+        self.clear()
+        for proj_state in state:
+            proj = self.free.pop() if self.free else Projectile(0, 0, 0.0, proj_state[9])
+            proj.restore(proj_state)
+            self.active.append(proj)
 
 class Player(PhysicsEntity):
+    __slots__ = ('particles', 'camera', 'char_type', 'color',
+                 'hook_state', 'hook_pos', 'hook_vel', 'hook_target_entity', 'hook_tension', 'jumps_left',
+                 'hook_box', 'hook_query', 'contact_box', 'scale_x', 'scale_y', 'facing_right', 'laser_trail', 'aim_pos',
+                 'current_weapon', 'shoot_cooldown', 'projectiles')
+
     def __init__(self, x, y, particles, camera, char_type="BLUE"):
         super().__init__(x, y, 30, 30)
         self.particles = particles
@@ -63,19 +140,48 @@ class Player(PhysicsEntity):
         self.hook_vel = pygame.math.Vector2(0,0)
         self.hook_target_entity = None
         self.hook_tension = 0
+        self.hook_box = pygame.Rect(0, 0, 20, 20)  # Detector do gancho em voo (reaproveitado)
+        self.hook_query = pygame.Rect(0, 0, 0, 0)  # Detector expandido: região da consulta de entidades
+        self.contact_box = pygame.Rect(0, 0, 0, 0)  # Região da consulta de colisão entre players
         self.jumps_left = 0
         
         # Visuals
         self.scale_x = 1.0; self.scale_y = 1.0; self.facing_right = True
         self.laser_trail = [] 
+        self.aim_pos = pygame.math.Vector2(x + 1, y)  # Mira em coordenadas de mundo (olhos e arma)
 
         # Weapons
-        self.current_weapon = 1; self.shoot_cooldown = 0; self.projectiles = [] 
+        self.current_weapon = 1; self.shoot_cooldown = 0; self.projectiles = ProjectilePool()
 
     def set_projectiles_list(self, proj_list):
+        # 'proj_list' é o ProjectilePool compartilhado da simulação
         self.projectiles = proj_list
 
-    def update(self, inputs, walls, entities):
+    def snapshot(self):
+        # 'laser_trail' é sempre trocado por uma lista nova, nunca alterado: basta a referência
+        hp, hv = self.hook_pos, self.hook_vel
+        return (super().snapshot(), self.hook_state, hp.x, hp.y, hv.x, hv.y, self.hook_target_entity,
+                self.hook_tension, self.jumps_left, self.scale_x, self.scale_y, self.facing_right,
+                self.laser_trail, self.aim_pos.x, self.aim_pos.y, self.current_weapon, self.shoot_cooldown)
+
+    def restore(self, state):
+        (base, self.hook_state, hx, hy, vx, vy, self.hook_target_entity, self.hook_tension, self.jumps_left,
+         self.scale_x, self.scale_y, self.facing_right, self.laser_trail, ax, ay,
+         self.current_weapon, self.shoot_cooldown) = state
+        super().restore(base)
+        self.hook_pos.update(hx, hy); self.hook_vel.update(vx, vy); self.aim_pos.update(ax, ay)
+
+    def update(self, inputs, world, entities):
+        # 'entities' é a EntityGrid do tick: consultas por raio/rect/segmento, iterável
+        self.update_actions(inputs, world, entities)
+        prev_ground = self.on_ground
+        self.update_physics(world)
+        self.update_contacts(entities, prev_ground)
+
+    def update_actions(self, inputs, world, entities):
+        # Tudo o que vem antes da física (no modo em lote, a física roda depois para todos)
+        if inputs['mouse_world'] is not None: self.aim_pos.update(inputs['mouse_world'])
+
         # 1. Weapon Switch
         if inputs['weapon1']: self.current_weapon = 1
         if inputs['weapon2']: self.current_weapon = 2
@@ -97,22 +203,28 @@ class Player(PhysicsEntity):
             self.particles.emit((self.rect.centerx, self.rect.bottom), 5, (200, 200, 200))
 
         # 3. Actions
-        self.update_hook(inputs, walls, entities)
-        self.update_weapons(inputs, walls, entities)
+        self.update_hook(inputs, world, entities)
+        self.update_weapons(inputs, world, entities)
 
-        # 4. Physics Walls
-        prev_ground = self.on_ground
-        self.update_physics(walls)
+    def update_contacts(self, entities, prev_ground):
+        # 4. Colisão entre players e efeitos de pouso (depois da física das paredes)
         self.handle_player_collision(entities)
+        entities.move(self)
 
         if not prev_ground and self.on_ground: self.scale_x = 1.3; self.scale_y = 0.7
         self.scale_x += (1.0 - self.scale_x) * 0.1
         self.scale_y += (1.0 - self.scale_y) * 0.1
-        if self.shoot_cooldown < Config.RIFLE_COOLDOWN - 5: self.laser_trail = []
+        if self.laser_trail and self.shoot_cooldown < Config.RIFLE_COOLDOWN - 5: self.laser_trail = []
 
     def handle_player_collision(self, entities):
-        for other in entities:
-            if other is self or not isinstance(other, PhysicsEntity): continue
+        # Consulta com folga: empurrões pequenos não obrigam a consultar de novo
+        region = self.contact_box
+        region.update(self.rect); region.inflate_ip(self.rect.width, self.rect.height)
+        others = entities.query_rect(region)
+        k = 0
+        while k < len(others):
+            other = others[k]; k += 1
+            if other is self: continue
             if self.rect.colliderect(other.rect):
                 dx = self.rect.centerx - other.rect.centerx
                 dy = self.rect.centery - other.rect.centery
@@ -128,54 +240,60 @@ class Player(PhysicsEntity):
                         if abs(dx) > 2 or abs(self.vel.x) > 0.1:
                             self.vel.x += (1 if dx > 0 else -1) * 0.8
                     else: self.pos.y += overlap_y; self.rect.y = int(self.pos.y); self.vel.y = 0
+                # O empurrão tirou o rect da região: refaz a consulta só com quem vem depois na lista
+                if not region.contains(self.rect):
+                    region.update(self.rect); region.inflate_ip(self.rect.width, self.rect.height)
+                    others = entities.query_rect(region, after=other); k = 0
 
-    def update_weapons(self, inputs, walls, entities):
+    def update_weapons(self, inputs, world, entities):
         if self.shoot_cooldown > 0: self.shoot_cooldown -= 1
         if inputs['shoot'] and self.shoot_cooldown == 0:
-            mouse_world = self.camera.to_world(inputs['mouse_pos'])
             center = pygame.math.Vector2(self.rect.center)
-            diff = mouse_world - center
+            diff = self.aim_pos - center
             angle = math.atan2(diff.y, diff.x); direction = diff.normalize()
             if self.char_type == "BLUE":
                 if self.current_weapon == 1: 
                     self.shoot_cooldown = Config.HAMMER_COOLDOWN; self.use_melee(center, angle, entities, False); self.camera.trigger_shake(2, 2)
                 elif self.current_weapon == 2: 
-                    self.shoot_cooldown = Config.GRENADE_COOLDOWN; proj = Projectile(center.x, center.y, angle, self.particles)
-                    self.projectiles.append(proj); self.vel -= direction * 4 
+                    self.shoot_cooldown = Config.GRENADE_COOLDOWN; self.projectiles.spawn(center.x, center.y, angle, self.particles)
+                    self.vel -= direction * 4 
             elif self.char_type == "DUMMY":
                 if self.current_weapon == 1: 
                     self.shoot_cooldown = Config.HAMMER_COOLDOWN; self.use_melee(center, angle, entities, True); self.camera.trigger_shake(2, 2)
                 elif self.current_weapon == 2: 
                     self.shoot_cooldown = Config.RIFLE_COOLDOWN; fire_pos = center + direction * 35 
-                    self.use_rifle(fire_pos, direction, walls, entities); self.camera.trigger_shake(3, 4); self.vel -= direction * 2 
+                    self.use_rifle(fire_pos, direction, world, entities); self.camera.trigger_shake(3, 4); self.vel -= direction * 2 
 
     def use_melee(self, center, angle, entities, is_bat):
         hit_range = Config.HAMMER_RANGE; hit_pos = center + pygame.math.Vector2(math.cos(angle), math.sin(angle)) * (hit_range * 0.8)
         force_dir = pygame.math.Vector2(math.cos(angle), math.sin(angle)); hit_something = False
-        for entity in entities:
-            if entity is not self and isinstance(entity, PhysicsEntity):
+        for entity in entities.query_radius(center, hit_range + 30):
+            if entity is not self:
                 if center.distance_to(entity.rect.center) < hit_range + 30: 
                     hit_something = True; entity.vel += force_dir * (Config.HAMMER_FORCE * 1.2 if is_bat else Config.HAMMER_FORCE)
                     self.particles.emit(entity.rect.center, 10, (255, 255, 255), 5)
         if hit_something: self.particles.emit(hit_pos, 5, (200, 200, 200), 2)
 
-    def use_rifle(self, start_pos, direction, walls, entities):
-        trajectory, hit_entity, hit_dir = MathUtils.raycast_bounce(start_pos, direction, walls, entities, Config.RIFLE_MAX_BOUNCES)
+    def use_rifle(self, start_pos, direction, world, entities):
+        trajectory, hit_entity, hit_dir = MathUtils.raycast_bounce(start_pos, direction, world, entities, Config.RIFLE_MAX_BOUNCES)
         self.laser_trail = trajectory 
         if hit_entity and isinstance(hit_entity, PhysicsEntity):
             hit_entity.vel += hit_dir * Config.RIFLE_FORCE; self.particles.emit(hit_entity.rect.center, 15, Config.COLOR_RIFLE_BEAM, 6)
 
-    def update_hook(self, inputs, walls, entities):
-        center = pygame.math.Vector2(self.rect.center)
+    def update_hook(self, inputs, world, entities):
+        # Sem Vector2 temporários: centro e direções em floats, vetores do gancho atualizados no lugar
+        cx, cy = self.rect.centerx, self.rect.centery
+        hook_pos, hook_vel = self.hook_pos, self.hook_vel
         
         # 0. Disparo
         if inputs['hook'] and self.hook_state == 0:
-            mouse_world = self.camera.to_world(inputs['mouse_pos'])
-            direction = (mouse_world - center).normalize()
-            self.hook_pos = pygame.math.Vector2(center)
-            self.hook_vel = direction * Config.HOOK_SPEED
-            self.hook_state = 1
-            self.hook_target_entity = None
+            dx, dy = self.aim_pos.x - cx, self.aim_pos.y - cy
+            length = math.sqrt(dx * dx + dy * dy)
+            if length > 0:
+                hook_pos.update(cx, cy)
+                hook_vel.update(dx / length * Config.HOOK_SPEED, dy / length * Config.HOOK_SPEED)
+                self.hook_state = 1
+                self.hook_target_entity = None
         
         # Soltar gancho
         if not inputs['hook']:
@@ -184,79 +302,86 @@ class Player(PhysicsEntity):
 
         # 1. Gancho em Voo
         if self.hook_state == 1:
-            self.hook_pos += self.hook_vel
-            if center.distance_to(self.hook_pos) > Config.HOOK_RANGE:
+            # Colisão Paredes (contínua: o segmento do voo inteiro, não só o ponto final)
+            hit = swept_point(world, hook_pos, hook_vel)
+            if hit:
+                hook_pos.x += hook_vel.x * hit[0]; hook_pos.y += hook_vel.y * hit[0]
+            else:
+                hook_pos += hook_vel
+            dx, dy = hook_pos.x - cx, hook_pos.y - cy
+            if math.sqrt(dx * dx + dy * dy) > Config.HOOK_RANGE:
                 self.hook_state = 0; return
-            
-            # Colisão Paredes
-            pt_rect = pygame.Rect(self.hook_pos.x, self.hook_pos.y, 1, 1)
-            for w in walls:
-                if w.colliderect(pt_rect): self.hook_state = 2; break
+            if hit: self.hook_state = 2
             
             # --- HITBOX EXPANDIDA PARA ENTIDADES ---
-            hook_detector = pygame.Rect(0, 0, 20, 20)
-            hook_detector.center = (self.hook_pos.x, self.hook_pos.y)
+            hook_detector = self.hook_box
+            hook_detector.center = (hook_pos.x, hook_pos.y)
+            hook_query = self.hook_query
+            hook_query.update(hook_detector); hook_query.inflate_ip(30, 30)
 
-            for entity in entities:
+            for entity in entities.query_rect(hook_query):
                 if entity is not self and entity.is_hookable:
-                    dummy_hitbox = entity.rect.inflate(30, 30) 
-                    if dummy_hitbox.colliderect(hook_detector): 
+                    # Igual a entity.rect.inflate(30, 30) contra o detector, sem alocar um Rect
+                    if entity.rect.colliderect(hook_query): 
                         self.hook_state = 2; self.hook_target_entity = entity
-                        self.hook_pos = pygame.math.Vector2(entity.rect.center)
+                        tx, ty = entity.rect.centerx, entity.rect.centery
+                        hook_pos.update(tx, ty)
                         # Yank inicial (puxão de impacto)
-                        target_center = pygame.math.Vector2(entity.rect.center)
-                        pull_dir = (center - target_center).normalize()
-                        entity.vel += pull_dir * Config.HOOK_YANK_FORCE
+                        px, py = cx - tx, cy - ty
+                        length = math.sqrt(px * px + py * py)
+                        if length > 0:
+                            entity.vel.x += px / length * Config.HOOK_YANK_FORCE
+                            entity.vel.y += py / length * Config.HOOK_YANK_FORCE
                         break
 
         # 2. Gancho Ancorado (Mola Física Mútua)
         if self.hook_state == 2:
-            if self.hook_target_entity: 
-                target_pos = pygame.math.Vector2(self.hook_target_entity.rect.center)
-                self.hook_pos = target_pos 
-            else:
-                target_pos = self.hook_pos
+            target = self.hook_target_entity
+            if target: 
+                hook_pos.update(target.rect.centerx, target.rect.centery)
+            tx, ty = hook_pos.x, hook_pos.y
             
-            diff = target_pos - center
-            dist = diff.length()
+            dx, dy = tx - cx, ty - cy
+            dist = math.sqrt(dx * dx + dy * dy)
 
             if dist > 5:
-                direction = diff.normalize()
+                dir_x, dir_y = dx / dist, dy / dist
                 
-                if not self.hook_target_entity:
+                if not target:
                     # Puxando a parede
-                    self.vel += direction * Config.HOOK_PULL_FORCE
+                    self.vel.x += dir_x * Config.HOOK_PULL_FORCE
+                    self.vel.y += dir_y * Config.HOOK_PULL_FORCE
                     self.hook_tension = 0.5
                 else:
                     # --- FÍSICA MÚTUA (DUMMY/PLAYER) ---
                     pull_margin = 70 
-                    pull_point = center + direction * pull_margin
-                    target_center = pygame.math.Vector2(self.hook_target_entity.rect.center)
+                    pull_x, pull_y = cx + dir_x * pull_margin, cy + dir_y * pull_margin
                     
                     # Lei de Hooke (Aceleração)
-                    vec_to_pull = pull_point - target_center
-                    spring_force = vec_to_pull * Config.HOOK_SPRING_K
+                    spring_x = (pull_x - tx) * Config.HOOK_SPRING_K
+                    spring_y = (pull_y - ty) * Config.HOOK_SPRING_K
                     
                     # Amortecimento Relativo (Damping)
-                    rel_vel = self.hook_target_entity.vel - self.vel
-                    damping_force = rel_vel * (1 - Config.HOOK_DAMPING)
+                    damping = 1 - Config.HOOK_DAMPING
+                    damp_x = (target.vel.x - self.vel.x) * damping
+                    damp_y = (target.vel.y - self.vel.y) * damping
                     
-                    final_accel = spring_force - damping_force
+                    accel_x, accel_y = spring_x - damp_x, spring_y - damp_y
                     
                     # Aplica força em AMBOS (Ação e Reação)
-                    self.hook_target_entity.vel += final_accel
-                    self.vel -= final_accel * 0.5 # Tu sentes o peso do dummy
+                    target.vel.x += accel_x; target.vel.y += accel_y
+                    self.vel.x -= accel_x * 0.5; self.vel.y -= accel_y * 0.5 # Tu sentes o peso do dummy
                     
                     # Anti-Gravidade Mútua (Flutuação clean de DDNet)
-                    if self.hook_target_entity.vel.y > 0:
-                        self.hook_target_entity.vel.y *= 0.94
+                    if target.vel.y > 0:
+                        target.vel.y *= 0.94
                     if self.vel.y > 0:
                         self.vel.y *= 0.96
 
                     # Limites de Velocidade
                     if self.vel.length() > 25: self.vel.scale_to_length(25)
                     
-                    self.hook_tension = min(1.0, final_accel.length() / 6.0)
+                    self.hook_tension = min(1.0, math.sqrt(accel_x * accel_x + accel_y * accel_y) / 6.0)
 
-    def draw(self, surface, camera):
-        entities_draw.draw_player(surface, camera, self)
\ No newline at end of file
+    def draw(self, surface, camera, alpha=1.0):
+        entities_draw.draw_player(surface, camera, self, alpha)
\ No newline at end of file
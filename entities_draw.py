@@ -1,81 +1,160 @@
 import pygame
 import math
+import numpy as np
+from collections import OrderedDict
 from config import Config
 
+class SpriteCache:
+    """Cache LRU de sprites pré-renderizados, com contadores de acerto/erro."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build, *args):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+        self.misses += 1
+        sprite = build(*args)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.capacity:
+            self.sprites.popitem(last=False)
+        return sprite
+
+sprite_cache = SpriteCache(Config.SPRITE_CACHE_SIZE)
+
+def _quantize(value, step):
+    return int(round(value / step))
+
+# Quadradinhos pré-renderizados, guardados no próprio ParticleManager junto da paleta
+# (o índice de cor é por gerenciador): índice = cor_idx * 8 + tamanho
+def _sync_particle_sprites(particles):
+    for color in particles.palette[len(particles.sprites) // 8:]:
+        for size in range(8):
+            sprite = pygame.Surface((max(1, size), max(1, size)))
+            sprite.fill(color)
+            particles.sprites.append(sprite)
+
 def draw_particles(surface, camera, particles):
-    for p in particles:
-        pos_screen = camera.apply_point((p[0], p[1]))
-        size = max(1, int(4 * (p[4] / 30)))
-        pygame.draw.rect(surface, p[5], (pos_screen[0], pos_screen[1], size, size))
+    n = particles.count
+    if n == 0: return
+    if len(particles.sprites) < len(particles.palette) * 8:
+        _sync_particle_sprites(particles)
 
-def draw_projectile(surface, camera, projectile):
+    # Coordenadas de tela e tamanhos calculados em lote direto dos arrays
+    s = camera.scale
+    xs = ((particles.pos[:n, 0] - camera.offset.x) * s).astype(np.int32)
+    ys = ((particles.pos[:n, 1] - camera.offset.y) * s).astype(np.int32)
+    sizes = np.clip((4 * particles.life[:n].astype(np.int32)) // 30, 1, 7)
+    if s != 1.0: sizes = np.clip((sizes * s + 0.5).astype(np.int32), 1, 7)
+    w, h = surface.get_size()
+    visible = (xs > -8) & (xs < w) & (ys > -8) & (ys < h)
+    if not visible.any(): return
+
+    keys = particles.color_idx[:n][visible].astype(np.int32) * 8 + sizes[visible]
+    sprites = map(particles.sprites.__getitem__, keys.tolist())
+    surface.blits(zip(sprites, zip(xs[visible].tolist(), ys[visible].tolist())), doreturn=False)
+
+def draw_projectile(surface, camera, projectile, alpha=1.0):
     draw_rect = camera.apply_rect(projectile.rect)
-    pygame.draw.circle(surface, Config.COLOR_GRENADE, draw_rect.center, 6)
+    if alpha < 1.0:
+        draw_rect.move_ip((projectile.pos - projectile.prev_pos) * ((alpha - 1.0) * camera.scale))
+    pygame.draw.circle(surface, Config.COLOR_GRENADE, draw_rect.center, max(1, round(6 * camera.scale)))
 
-def draw_player(surface, camera, player):
-    center = player.rect.center
+def draw_player(surface, camera, player, alpha=1.0):
+    center = player.render_center(alpha)
     draw_center = camera.apply_point(center)
+    s = camera.scale  # Tamanhos em pixels do framebuffer (1.0 = resolução da tela)
 
     # 1. Rastro do Laser
     if player.laser_trail:
-        for i in range(len(player.laser_trail)):
+        for i in range(min(len(player.laser_trail), Config.LASER_TRAIL_SEGMENTS)):
             start, end = player.laser_trail[i]
             p1 = camera.apply_point((start.x, start.y))
             p2 = camera.apply_point((end.x, end.y))
-            pygame.draw.line(surface, Config.COLOR_RIFLE_BEAM, p1, p2, 3)
+            pygame.draw.line(surface, Config.COLOR_RIFLE_BEAM, p1, p2, max(1, round(3 * s)))
 
     # 2. Hook com Espessura e Cor Dinâmica
     if player.hook_state != 0:
-        hook_screen = camera.apply_point(player.hook_pos)
+        hook_target = player.hook_target_entity
+        hook_screen = camera.apply_point(hook_target.render_center(alpha) if hook_target else player.hook_pos)
         tension = getattr(player, 'hook_tension', 0)
         color_val = int(150 + (105 * tension))
-        thickness = int(3 + (4 * tension))
+        thickness = max(1, int((3 + (4 * tension)) * s))
         pygame.draw.line(surface, (color_val, color_val, color_val), draw_center, hook_screen, thickness)
-        pygame.draw.circle(surface, (50, 50, 50), hook_screen, 5)
+        pygame.draw.circle(surface, (50, 50, 50), hook_screen, max(1, round(5 * s)))
 
-    # 3. Corpo com Inclinação (Inércia Rotacional)
-    tilt_angle = -player.vel.x * 1.5 
-    w = max(1, int(player.rect.width * player.scale_x))
-    h = max(1, int(player.rect.height * player.scale_y))
-    body_surf = pygame.Surface((w, h), pygame.SRCALPHA)
-    pygame.draw.rect(body_surf, player.color, (0, 0, w, h), border_radius=5)
-    rotated_body = pygame.transform.rotate(body_surf, tilt_angle)
+    # 3. Corpo com Inclinação (Inércia Rotacional) - sprite cacheado por escala/ângulo quantizados
+    # Sem PLAYER_SQUASH (qualidade baixa) o corpo fica reto: um sprite só por player
+    scale_x, scale_y = (player.scale_x, player.scale_y) if Config.PLAYER_SQUASH else (1.0, 1.0)
+    q_sx = _quantize(scale_x, Config.SPRITE_SCALE_STEP)
+    q_sy = _quantize(scale_y, Config.SPRITE_SCALE_STEP)
+    q_tilt = _quantize(-player.vel.x * 1.5, Config.SPRITE_ANGLE_STEP) if Config.PLAYER_SQUASH else 0
+    size = (round(player.rect.width * s), round(player.rect.height * s))
+    key = ('body', player.char_type, size[0], size[1], q_sx, q_sy, q_tilt)
+    rotated_body = sprite_cache.get(key, _build_body, player.color, size, q_sx, q_sy, q_tilt, max(1, round(5 * s)))
     body_rect = rotated_body.get_rect(center=draw_center)
     surface.blit(rotated_body, body_rect)
     
     # 4. Arma e Olhos
-    mouse_pos = pygame.mouse.get_pos()
-    mouse_dir = (pygame.math.Vector2(mouse_pos) - pygame.math.Vector2(draw_center))
+    mouse_dir = player.aim_pos - pygame.math.Vector2(center)
     if mouse_dir.length() > 0: mouse_dir = mouse_dir.normalize()
     angle = math.degrees(math.atan2(mouse_dir.y, mouse_dir.x))
     
     if player.current_weapon == 1:
-        _draw_melee(surface, draw_center, angle, player.facing_right, player.shoot_cooldown, (player.char_type == "DUMMY"))
+        _draw_melee(surface, draw_center, angle, player.facing_right, player.shoot_cooldown, (player.char_type == "DUMMY"), s)
     else:
         weapon_color = Config.COLOR_RIFLE_BEAM if player.char_type == "DUMMY" else Config.COLOR_GRENADE
-        weapon_end = (draw_center[0] + mouse_dir.x * 25, draw_center[1] + mouse_dir.y * 25)
-        pygame.draw.line(surface, weapon_color, draw_center, weapon_end, 6)
-
-    _draw_eyes(surface, draw_center, mouse_dir, player.facing_right, player.scale_x, player.scale_y)
-
-def _draw_eyes(surface, center, mouse_dir, facing_right, scale_x, scale_y):
-    eye_offset_x = 8 * scale_x * (1 if facing_right else -1)
-    eye_l = (center[0] - 6 + (2 if facing_right else -2), center[1] - 5 * scale_y)
-    eye_r = (center[0] + 6 + (2 if facing_right else -2), center[1] - 5 * scale_y)
-    pygame.draw.circle(surface, (255, 255, 255), eye_l, 6)
-    pygame.draw.circle(surface, (255, 255, 255), eye_r, 6)
-    pupil_offset = mouse_dir * 2
-    pygame.draw.circle(surface, (0, 0, 0), (eye_l[0] + pupil_offset.x, eye_l[1] + pupil_offset.y), 3)
-    pygame.draw.circle(surface, (0, 0, 0), (eye_r[0] + pupil_offset.x, eye_r[1] + pupil_offset.y), 3)
-
-def _draw_melee(surface, center, angle, facing_right, cooldown, is_bat):
+        weapon_end = (draw_center[0] + mouse_dir.x * 25 * s, draw_center[1] + mouse_dir.y * 25 * s)
+        pygame.draw.line(surface, weapon_color, draw_center, weapon_end, max(1, round(6 * s)))
+
+    _draw_eyes(surface, draw_center, mouse_dir, player.facing_right, scale_x, scale_y, s)
+
+def _build_body(color, size, q_sx, q_sy, q_tilt, radius=5):
+    w = max(1, int(size[0] * q_sx * Config.SPRITE_SCALE_STEP))
+    h = max(1, int(size[1] * q_sy * Config.SPRITE_SCALE_STEP))
+    body_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+    pygame.draw.rect(body_surf, color, (0, 0, w, h), border_radius=radius)
+    return pygame.transform.rotate(body_surf, q_tilt * Config.SPRITE_ANGLE_STEP)
+
+def _scaled(sprite, scale):
+    # Sprites desenhados em coordenadas fixas: no framebuffer reduzido, a cópia é reduzida uma vez
+    if scale == 1.0: return sprite
+    w, h = sprite.get_size()
+    return pygame.transform.smoothscale(sprite, (max(1, round(w * scale)), max(1, round(h * scale))))
+
+def _draw_eyes(surface, center, mouse_dir, facing_right, scale_x, scale_y, scale=1.0):
+    # Os dois olhos (com pupilas) num sprite só; a posição das pupilas é quantizada em 0.5px
+    q_px = _quantize(mouse_dir.x * 2, 0.5)
+    q_py = _quantize(mouse_dir.y * 2, 0.5)
+    eyes = sprite_cache.get(('eyes', q_px, q_py, scale), _build_eyes, q_px * 0.5, q_py * 0.5, scale)
+    eye_l_x = center[0] + (-6 + (2 if facing_right else -2)) * scale
+    eye_y = center[1] - 5 * scale_y * scale
+    surface.blit(eyes, (eye_l_x - 7 * scale, eye_y - 7 * scale))
+
+def _build_eyes(pupil_x, pupil_y, scale=1.0):
+    eyes = pygame.Surface((28, 14), pygame.SRCALPHA)
+    for eye_x in (7, 19):
+        pygame.draw.circle(eyes, (255, 255, 255), (eye_x, 7), 6)
+        pygame.draw.circle(eyes, (0, 0, 0), (eye_x + pupil_x, 7 + pupil_y), 3)
+    return _scaled(eyes, scale)
+
+def _draw_melee(surface, center, angle, facing_right, cooldown, is_bat, scale=1.0):
     swing = -60 if facing_right else 60 if cooldown > Config.HAMMER_COOLDOWN * 0.5 else 0
+    q_rot = _quantize(-angle + swing, Config.SPRITE_ANGLE_STEP)
+    rotated = sprite_cache.get(('melee', is_bat, q_rot, scale), _build_melee, is_bat, q_rot, scale)
+    rect = rotated.get_rect(center=center)
+    offset = pygame.math.Vector2(20 * scale, 0).rotate(angle)
+    surface.blit(rotated, (rect.x + offset.x, rect.y + offset.y))
+
+def _build_melee(is_bat, q_rot, scale=1.0):
     w_surf = pygame.Surface((50, 40), pygame.SRCALPHA)
     if is_bat: pygame.draw.polygon(w_surf, Config.COLOR_BAT, [(0, 18), (45, 12), (45, 24), (0, 22)])
     else: 
         pygame.draw.rect(w_surf, Config.COLOR_HAMMER_HANDLE, (0, 15, 30, 6))
         pygame.draw.rect(w_surf, Config.COLOR_HAMMER_HEAD, (20, 8, 12, 20))
-    rotated = pygame.transform.rotate(w_surf, -angle + swing)
-    rect = rotated.get_rect(center=center)
-    offset = pygame.math.Vector2(20, 0).rotate(angle)
-    surface.blit(rotated, (rect.x + offset.x, rect.y + offset.y))
\ No newline at end of file
+    return _scaled(pygame.transform.rotate(w_surf, q_rot * Config.SPRITE_ANGLE_STEP), scale)
\ No newline at end of file
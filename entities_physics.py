@@ -1,83 +1,476 @@
 import pygame
 import math
 import random
+from bisect import insort
+import numpy as np
 from config import Config
 import entities_draw # Importa o desenhista
 
 class ParticleManager:
-    def __init__(self):
-        self.particles = []
+    """
+    Partículas em Structure-of-Arrays (NumPy) com capacidade fixa.
+    As partículas vivas ocupam sempre as primeiras 'count' linhas dos arrays.
+    """
+    def __init__(self, capacity=Config.PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.color_idx = np.zeros(capacity, dtype=np.uint16)
+
+        # Paleta: cor -> índice (os arrays guardam só o índice)
+        self.palette = []
+        self.palette_index = {}
+        self.sprites = []  # Quadradinhos pré-renderizados da paleta (ver entities_draw.draw_particles)
+
+        # RNG próprio, semeado pelo 'random' global para manter as execuções reproduzíveis
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.emit_carry = 0.0  # Fração de partícula acumulada com PARTICLE_EMIT_SCALE < 1
+
+    def color_index(self, color):
+        idx = self.palette_index.get(color)
+        if idx is None:
+            idx = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = idx
+        return idx
 
     def emit(self, pos, count, color, speed=5):
-        for _ in range(count):
-            angle = random.uniform(0, 6.28)
-            velocity = random.uniform(1, speed)
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-            life = random.randint(20, 40)
-            self.particles.append([pos[0], pos[1], vx, vy, life, color])
+        # Emissão em lote, reduzida pela qualidade; o excedente do limite é descartado
+        if Config.PARTICLE_EMIT_SCALE != 1.0:
+            scaled = count * Config.PARTICLE_EMIT_SCALE + self.emit_carry
+            count = int(scaled)
+            self.emit_carry = scaled - count
+        count = min(count, min(self.capacity, Config.PARTICLE_LIMIT) - self.count)
+        if count <= 0: return
+        start, end = self.count, self.count + count
+
+        angle = self.rng.uniform(0, 6.28, count)
+        velocity = self.rng.uniform(1, speed, count)
+        self.pos[start:end, 0] = pos[0]
+        self.pos[start:end, 1] = pos[1]
+        self.vel[start:end, 0] = np.cos(angle) * velocity
+        self.vel[start:end, 1] = np.sin(angle) * velocity
+        self.life[start:end] = self.rng.integers(20, 41, count)
+        self.color_idx[start:end] = self.color_index(color)
+        self.count = end
 
     def update(self):
-        for p in self.particles[:]:
-            p[0] += p[2]
-            p[1] += p[3]
-            p[2] *= 0.95 
-            p[3] *= 0.95 
-            p[4] -= 1    
-            if p[4] <= 0:
-                self.particles.remove(p)
+        n = self.count
+        if n == 0: return
+        self.pos[:n] += self.vel[:n]
+        self.vel[:n] *= 0.95
+        self.life[:n] -= 1
+
+        # Compacta as mortas numa passada só (máscara booleana)
+        alive = self.life[:n] > 0
+        live = int(np.count_nonzero(alive))
+        if live != n:
+            self.pos[:live] = self.pos[:n][alive]
+            self.vel[:live] = self.vel[:n][alive]
+            self.life[:live] = self.life[:n][alive]
+            self.color_idx[:live] = self.color_idx[:n][alive]
+            self.count = live
+
+    def snapshot(self):
+        # Só as linhas vivas são copiadas; a paleta só cresce, então os índices continuam valendo
+        n = self.count
+        return (n, self.pos[:n].copy(), self.vel[:n].copy(), self.life[:n].copy(),
+                self.color_idx[:n].copy(), self.rng.bit_generator.state, self.emit_carry)
+
+    def restore(self, state):
+        n, pos, vel, life, color_idx, rng_state, self.emit_carry = state
+        self.pos[:n] = pos; self.vel[:n] = vel; self.life[:n] = life; self.color_idx[:n] = color_idx
+        self.count = n
+        self.rng.bit_generator.state = rng_state
 
     def draw(self, surface, camera):
         # Delega o desenho para o módulo visual
-        entities_draw.draw_particles(surface, camera, self.particles)
+        entities_draw.draw_particles(surface, camera, self)
+
+# Rect de teste reaproveitado pelo chão grudento (a física roda numa thread só)
+_ground_probe = pygame.Rect(0, 0, 0, 0)
+
+def swept_aabb(world, rect, delta):
+    """
+    Colisão contínua de um AABB contra os blocos do mapa, movendo-se 'delta' neste tick.
+    Testa só os blocos dentro da caixa varrida (slabs por eixo).
+    Retorna (tempo_de_impacto em [0, 1], normal_da_face) do primeiro bloco, ou None.
+    Blocos já sobrepostos no início são ignorados: isso é do teste de sobreposição.
+    """
+    ts = world.tile_size
+    dx, dy = delta
+    x0, y0, x1, y1 = rect.left, rect.top, rect.right, rect.bottom
+    col0, col1 = int(min(x0, x0 + dx) // ts), math.ceil(max(x1, x1 + dx) / ts) - 1
+    row0, row1 = int(min(y0, y0 + dy) // ts), math.ceil(max(y1, y1 + dy) / ts) - 1
+
+    best = None
+    for col in range(col0, col1 + 1):
+        tx0, tx1 = col * ts, (col + 1) * ts
+        if dx > 0: ex, lx = (tx0 - x1) / dx, (tx1 - x0) / dx
+        elif dx < 0: ex, lx = (tx1 - x0) / dx, (tx0 - x1) / dx
+        elif x1 <= tx0 or x0 >= tx1: continue
+        else: ex, lx = -math.inf, math.inf
+        for row in range(row0, row1 + 1):
+            if not world.solid_at(col, row): continue
+            ty0, ty1 = row * ts, (row + 1) * ts
+            if dy > 0: ey, ly = (ty0 - y1) / dy, (ty1 - y0) / dy
+            elif dy < 0: ey, ly = (ty1 - y0) / dy, (ty0 - y1) / dy
+            elif y1 <= ty0 or y0 >= ty1: continue
+            else: ey, ly = -math.inf, math.inf
+
+            entry, leave = max(ex, ey), min(lx, ly)
+            if entry < 0 or entry > 1 or entry >= leave: continue
+            if best is None or entry < best[0]:
+                normal = ((-1 if dx > 0 else 1), 0) if ex > ey else (0, (-1 if dy > 0 else 1))
+                best = (entry, normal)
+    return best
+
+def swept_point(world, start, delta):
+    """
+    Colisão contínua de um ponto (segmento start -> start + delta) contra os blocos.
+    Retorna (tempo_de_impacto em [0, 1], normal_da_face) ou None.
+    """
+    length = math.hypot(delta[0], delta[1])
+    if length == 0: return None
+    hit = world.raycast(start, (delta[0] / length, delta[1] / length), length)
+    if hit is None: return None
+    return hit[0] / length, hit[2]
 
 class PhysicsEntity:
+    __slots__ = ('pos', 'prev_pos', 'vel', 'rect', 'on_ground', 'is_hookable')
+
     def __init__(self, x, y, width, height):
         self.pos = pygame.math.Vector2(x, y)
+        self.prev_pos = pygame.math.Vector2(x, y)  # Posição no tick anterior (interpolação)
         self.vel = pygame.math.Vector2(0, 0)
         self.rect = pygame.Rect(x, y, width, height)
         self.on_ground = False
         self.is_hookable = True
 
-    def update_physics(self, walls):
+    def snapshot(self):
+        # Estado em números soltos: guardar é montar uma tupla, sem copiar Vector2/Rect
+        p, pp, v, r = self.pos, self.prev_pos, self.vel, self.rect
+        return (p.x, p.y, pp.x, pp.y, v.x, v.y, r.x, r.y, self.on_ground)
+
+    def restore(self, state):
+        self.pos.update(state[0], state[1]); self.prev_pos.update(state[2], state[3])
+        self.vel.update(state[4], state[5]); self.rect.topleft = (state[6], state[7])
+        self.on_ground = state[8]
+
+    def render_center(self, alpha):
+        # Centro interpolado entre o tick anterior e o atual (alpha em [0, 1])
+        if alpha >= 1.0: return self.rect.center
+        k = alpha - 1.0
+        return (self.rect.centerx + (self.pos.x - self.prev_pos.x) * k,
+                self.rect.centery + (self.pos.y - self.prev_pos.y) * k)
+
+    def swept_step(self, world, axis):
+        """
+        Passo contínuo num eixo (0 = X, 1 = Y), só acima de SWEEP_MIN_SPEED: nessa
+        velocidade o teste de sobreposição depois do passo pode atravessar blocos.
+        Se bater, encosta o rect na face, zera a velocidade do eixo e retorna True.
+        """
+        v = self.vel[axis]
+        if abs(v) <= Config.SWEEP_MIN_SPEED: return False
+        hit = swept_aabb(world, self.rect, (v, 0) if axis == 0 else (0, v))
+        if hit is None: return False
+        r = self.rect
+        if axis == 0:
+            if v > 0: r.right = round(r.right + v * hit[0])
+            else: r.left = round(r.left + v * hit[0])
+            self.pos.x = r.x
+        else:
+            if v > 0: r.bottom = round(r.bottom + v * hit[0]); self.on_ground = True
+            else: r.top = round(r.top + v * hit[0])
+            self.pos.y = r.y
+        self.vel[axis] = 0
+        return True
+
+    def update_physics(self, world):
         self.vel.y += Config.GRAVITY
         self.vel.y = min(self.vel.y, Config.TERMINAL_VELOCITY)
 
         # X Movement
-        self.pos.x += self.vel.x
-        self.rect.x = int(self.pos.x) 
-        hits = [w for w in walls if self.rect.colliderect(w)]
-        for wall in hits:
-            if self.vel.x > 0:
-                self.rect.right = wall.left; self.pos.x = self.rect.x; self.vel.x = 0
-            elif self.vel.x < 0:
-                self.rect.left = wall.right; self.pos.x = self.rect.x; self.vel.x = 0
+        if not self.swept_step(world, 0):
+            self.pos.x += self.vel.x
+            self.rect.x = int(self.pos.x) 
+            if self.vel.x != 0:
+                edge = world.sweep_aabb(self.rect, 0, self.vel.x)
+                if edge is not None:
+                    if self.vel.x > 0: self.rect.right = edge
+                    else: self.rect.left = edge
+                    self.pos.x = self.rect.x; self.vel.x = 0
 
         # Y Movement - CORREÇÃO DE VIBRAÇÃO (Sticky Ground)
         # Se já estávamos no chão e não estamos pulando (vel >= 0),
         # verifica se tem chão logo abaixo (1 pixel) para "colar" o personagem
         # e evitar o ciclo de cair-colidir-resetar que causa a vibração.
         if self.on_ground and self.vel.y >= 0:
-             test_rect = self.rect.move(0, 1)
-             ground_hits = [w for w in walls if test_rect.colliderect(w)]
-             if ground_hits:
-                 # Encontra o chão mais alto logo abaixo
-                 highest_wall = min(ground_hits, key=lambda w: w.top)
-                 
+             test_rect = _ground_probe
+             test_rect.update(self.rect); test_rect.y += 1
+             # Encontra o chão mais alto logo abaixo
+             ground_top = world.sweep_aabb(test_rect, 1, 1)
+             if ground_top is not None:
                  # Cola o player no chão
-                 self.rect.bottom = highest_wall.top
+                 self.rect.bottom = ground_top
                  self.pos.y = self.rect.y
                  self.vel.y = 0
                  self.on_ground = True
                  return # Pula o resto da física Y para este frame (estabilidade total)
 
         # Física Padrão Y (se estiver no ar ou pulando)
+        self.on_ground = False
+        if self.swept_step(world, 1): return
         self.pos.y += self.vel.y
         self.rect.y = int(self.pos.y)
-        self.on_ground = False
-        hits = [w for w in walls if self.rect.colliderect(w)]
-        for wall in hits:
-            if self.vel.y > 0:
-                self.rect.bottom = wall.top; self.pos.y = self.rect.y; self.vel.y = 0; self.on_ground = True
-            elif self.vel.y < 0:
-                self.rect.top = wall.bottom; self.pos.y = self.rect.y; self.vel.y = 0
\ No newline at end of file
+        if self.vel.y != 0:
+            edge = world.sweep_aabb(self.rect, 1, self.vel.y)
+            if edge is not None:
+                if self.vel.y > 0:
+                    self.rect.bottom = edge; self.on_ground = True
+                else:
+                    self.rect.top = edge
+                self.pos.y = self.rect.y; self.vel.y = 0
+
+class PhysicsBatch:
+    """
+    Integrador em lote para muitos PhysicsEntity: gravidade, velocidade terminal,
+    chão "grudento" e a resolução X/Y contra os blocos rodam em passadas NumPy,
+    com o mesmo resultado de update_physics corpo a corpo.
+    Os Vector2/Rect dos corpos não podem apontar para memória NumPy, então cada
+    step() copia pos/vel/rect/on_ground para as linhas dos arrays, integra e devolve.
+    Corpos acima de SWEEP_MIN_SPEED seguem pelo caminho escalar (colisão contínua).
+    """
+    def __init__(self):
+        self.occ = np.zeros((0, 0), dtype=np.uint8)  # Janela densa de ocupação (linha, coluna)
+        self.row0 = self.col0 = 0
+        self.tile_size = 1
+
+    def build_window(self, grid, row_min, row_max, col_min, col_max):
+        """Copia os bytearrays dos TileChunks para uma janela densa [row_min, row_max] x [col_min, col_max]."""
+        occ = np.zeros((row_max - row_min + 1, col_max - col_min + 1), dtype=np.uint8)
+        for chunk in grid.chunks.values():
+            if not chunk.cols: continue
+            r0, r1 = max(row_min, chunk.row0), min(row_max, chunk.row0 + chunk.rows - 1)
+            c0, c1 = max(col_min, chunk.col0), min(col_max, chunk.col0 + chunk.cols - 1)
+            if r0 > r1 or c0 > c1: continue
+            data = np.frombuffer(chunk.data, dtype=np.uint8).reshape(chunk.rows, chunk.cols)
+            occ[r0 - row_min:r1 - row_min + 1, c0 - col_min:c1 - col_min + 1] = \
+                data[r0 - chunk.row0:r1 - chunk.row0 + 1, c0 - chunk.col0:c1 - chunk.col0 + 1]
+        self.occ, self.row0, self.col0, self.tile_size = occ, row_min, col_min, grid.tile_size
+
+    def sweep(self, left, top, right, bottom, axis, direction):
+        """
+        Versão vetorizada de TileGrid.sweep_aabb: para cada corpo, a face do primeiro bloco
+        sólido a partir da borda que avança. 'direction' é um array de sinais (sem zeros).
+        Retorna (achou, face).
+        """
+        ts = self.tile_size
+        col0, col1 = left // ts, (right - 1) // ts
+        row0, row1 = top // ts, (bottom - 1) // ts
+        if axis == 0:
+            lead0, lead1, side0, side1 = col0, col1, row0, row1
+        else:
+            lead0, lead1, side0, side1 = row0, row1, col0, col1
+        forward = direction > 0
+        found = np.zeros(len(left), dtype=bool)
+        face = np.zeros(len(left), dtype=np.int64)
+        for k in range(int((lead1 - lead0).max()) + 1):
+            lead = np.where(forward, lead0 + k, lead1 - k)
+            valid = (lead0 + k <= lead1) & ~found
+            hit = np.zeros(len(left), dtype=bool)
+            for j in range(int((side1 - side0).max()) + 1):
+                side = side0 + j
+                if axis == 0: rows, cols = side, lead
+                else: rows, cols = lead, side
+                hit |= (side <= side1) & (self.occ[rows - self.row0, cols - self.col0] != 0)
+            hit &= valid
+            face[hit] = np.where(forward, lead, lead + 1)[hit] * ts
+            found |= hit
+        return found, face
+
+    def step(self, bodies, world):
+        n = len(bodies)
+        if n == 0: return
+        state = np.array([(b.pos.x, b.pos.y, b.vel.x, b.vel.y) for b in bodies], dtype=np.float64)
+        rects = np.array([(b.rect.x, b.rect.y, b.rect.width, b.rect.height, b.on_ground) for b in bodies], dtype=np.int64)
+        px, py, vx, vy = state.T.copy()
+        rx, ry, rw, rh = rects[:, 0].copy(), rects[:, 1].copy(), rects[:, 2], rects[:, 3]
+        on_ground = rects[:, 4] != 0
+
+        vy = np.minimum(vy + Config.GRAVITY, Config.TERMINAL_VELOCITY)
+
+        # Rápidos demais para a resolução por sobreposição: caminho escalar com colisão contínua
+        fast = (np.abs(vx) > Config.SWEEP_MIN_SPEED) | (np.abs(vy) > Config.SWEEP_MIN_SPEED)
+        for i in np.flatnonzero(fast): bodies[i].update_physics(world)
+        if fast.all(): return
+        vx = np.where(fast, 0.0, vx); vy = np.where(fast, 0.0, vy)  # Parados nos arrays (já resolvidos)
+
+        # Janela de ocupação cobrindo todos os corpos com folga de um passo
+        ts = world.tile_size
+        margin = int(Config.SWEEP_MIN_SPEED // ts) + 2
+        self.build_window(world.grid, int(ry.min() // ts) - margin, int((ry + rh).max() // ts) + margin,
+                          int(rx.min() // ts) - margin, int((rx + rw).max() // ts) + margin)
+
+        # X
+        px = px + vx
+        rx = np.trunc(px).astype(np.int64)
+        moving = (vx != 0) & ~fast
+        found, face = self.sweep(rx, ry, rx + rw, ry + rh, 0, np.where(vx > 0, 1, -1))
+        hit = moving & found
+        rx = np.where(hit, np.where(vx > 0, face - rw, face), rx)
+        px = np.where(hit, rx, px)
+        vx = np.where(hit, 0.0, vx)
+
+        # Y: chão grudento (quem já estava no chão e não está subindo)
+        found, face = self.sweep(rx, ry + 1, rx + rw, ry + 1 + rh, 1, np.ones(n, dtype=np.int64))
+        sticky = on_ground & (vy >= 0) & found & ~fast
+        ry = np.where(sticky, face - rh, ry)
+        py = np.where(sticky, ry, py)
+        vy = np.where(sticky, 0.0, vy)
+
+        # Y padrão
+        free = ~sticky & ~fast
+        py = np.where(free, py + vy, py)
+        ry = np.where(free, np.trunc(py).astype(np.int64), ry)
+        on_ground = sticky.copy()
+        found, face = self.sweep(rx, ry, rx + rw, ry + rh, 1, np.where(vy > 0, 1, -1))
+        hit = free & (vy != 0) & found
+        ry = np.where(hit, np.where(vy > 0, face - rh, face), ry)
+        on_ground |= hit & (vy > 0)
+        py = np.where(hit, ry, py)
+        vy = np.where(hit, 0.0, vy)
+
+        # Devolve para os objetos
+        out = zip(bodies, fast.tolist(), px.tolist(), py.tolist(), vx.tolist(), vy.tolist(),
+                  rx.tolist(), ry.tolist(), on_ground.tolist())
+        for b, skip, x, y, ux, uy, ix, iy, ground in out:
+            if skip: continue
+            b.pos.update(x, y); b.vel.update(ux, uy)
+            b.rect.topleft = (ix, iy); b.on_ground = ground
+
+class EntityGrid:
+    """
+    Broadphase entre entidades, refeita a cada tick (rebuild).
+    Com muitas entidades usa uma grade uniforme, com move() para re-indexar quem se
+    mexeu no meio do tick; com poucas (até ENTITY_GRID_MIN), uma varredura em C
+    (Rect.collidelistall) sobre os rects vivos sai mais barata que visitar células.
+    As células guardam a posição da entidade na lista do rebuild, então as consultas
+    devolvem as entidades na mesma ordem da lista original: trocar um laço
+    'for entity in entities' por uma consulta não muda o resultado.
+    Iterar a grade percorre todas as entidades.
+    """
+    def __init__(self, cell_size=Config.ENTITY_CELL_SIZE, grid_min=Config.ENTITY_GRID_MIN):
+        self.cell_size = cell_size
+        self.grid_min = grid_min
+        self.use_cells = False
+        self.cells = {}     # (cx, cy) -> posições em 'entities', em ordem crescente
+        self.entities = []
+        self.rects = []     # Os próprios rects das entidades (sempre atuais)
+        self.order = {}     # id(entidade) -> posição na lista
+        self.ranges = []    # posição -> (cx0, cy0, cx1, cy1) ocupado na grade
+
+    def __iter__(self): return iter(self.entities)
+    def __len__(self): return len(self.entities)
+
+    def cell_range(self, left, top, right, bottom):
+        cs = self.cell_size
+        return (int(left // cs), int(top // cs), int((right - 1) // cs), int((bottom - 1) // cs))
+
+    def rebuild(self, entities):
+        # Reaproveita as listas e o dicionário do tick anterior
+        self.entities.clear(); self.rects.clear(); self.order.clear()
+        for e in entities:
+            if isinstance(e, PhysicsEntity):
+                self.order[id(e)] = len(self.entities)
+                self.entities.append(e); self.rects.append(e.rect)
+        self.cells.clear()
+        self.use_cells = len(self.entities) > self.grid_min
+        if not self.use_cells: return
+        self.ranges = [None] * len(self.entities)
+        for i, r in enumerate(self.rects):
+            self._insert(i, self.cell_range(r.left, r.top, r.right, r.bottom))
+
+    def move(self, entity):
+        """Atualiza as células de uma entidade que mudou de rect durante o tick."""
+        if not self.use_cells: return
+        i = self.order.get(id(entity))
+        if i is None: return
+        r = entity.rect
+        new = self.cell_range(r.left, r.top, r.right, r.bottom)
+        old = self.ranges[i]
+        if new == old: return
+        self._remove(i, old)
+        self._insert(i, new)
+
+    def _insert(self, i, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        self.ranges[i] = cell_range
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None: cells[(cx, cy)] = [i]
+                elif bucket[-1] < i: bucket.append(i)
+                else: insort(bucket, i)
+
+    def _remove(self, i, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells[(cx, cy)]
+                bucket.remove(i)
+                if not bucket: del cells[(cx, cy)]
+
+    def _candidates(self, rect):
+        """Posições (em ordem) das entidades nas células que cobrem 'rect'."""
+        cx0, cy0, cx1, cy1 = self.cell_range(rect.left, rect.top, rect.right, rect.bottom)
+        cells = self.cells
+        if cx0 == cx1 and cy0 == cy1: return cells.get((cx0, cy0), ())
+        found = set()
+        # Região maior que a grade ocupada: mais barato filtrar as células existentes
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1: found.update(bucket)
+        else:
+            get = cells.get
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = get((cx, cy))
+                    if bucket: found.update(bucket)
+        return sorted(found)
+
+    def _overlapping(self, rect, first=0):
+        """Posições (em ordem) das entidades cujo rect colide com 'rect'."""
+        if not self.use_cells:
+            hits = rect.collidelistall(self.rects)
+            return hits if first == 0 else [i for i in hits if i >= first]
+        rects = self.rects
+        return [i for i in self._candidates(rect) if i >= first and rect.colliderect(rects[i])]
+
+    def query_rect(self, rect, after=None):
+        """Entidades cujo rect colide com 'rect'; com 'after', só as que vêm depois dela na lista."""
+        first = 0 if after is None else self.order[id(after)] + 1
+        entities = self.entities
+        return [entities[i] for i in self._overlapping(rect, first)]
+
+    def query_radius(self, center, radius):
+        """
+        Candidatas num raio: entidades cujo rect toca o quadrado que envolve o círculo
+        (com 1px de folga para posições fracionárias). O teste exato fica com quem chama.
+        """
+        x, y = int(center[0]), int(center[1])
+        size = 2 * radius + 4
+        return self.query_rect(pygame.Rect(x - radius - 2, y - radius - 2, size, size))
+
+    def query_segment(self, p1, p2):
+        """Entidades cujo rect é cortado pelo segmento p1-p2."""
+        left, top = int(min(p1[0], p2[0])) - 1, int(min(p1[1], p2[1])) - 1
+        right, bottom = int(max(p1[0], p2[0])) + 2, int(max(p1[1], p2[1])) + 2
+        box = pygame.Rect(left, top, right - left, bottom - top)
+        rects = self.rects
+        entities = self.entities
+        return [entities[i] for i in self._overlapping(box) if rects[i].clipline(p1, p2)]
@@ -1,12 +1,22 @@
+import time
+STARTED = time.perf_counter()  # Referência do relatório de partida a frio
+import random
 import pygame
+PYGAME_IMPORTED = time.perf_counter()  # O import do pygame (com NumPy e pkg_resources) é a maior etapa
+
 from config import Config
-from core import InputHandler, Camera
-from map_system import InfiniteMap
-from entities import Player, ParticleManager
+from core import InputHandler, TextRenderer
+from profiler import Profiler
+from quality import QualityGovernor
 
 class Game:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, report_startup=False):
+        # Etapa -> ms desde o início do main.py
+        self.startup = {'import_pygame': (PYGAME_IMPORTED - STARTED) * 1000.0, 'imports': self.elapsed_ms()}
+        self.report_startup = report_startup
+        # Só o que o jogo usa: pygame.init() também sobe mixer, joystick etc.
+        pygame.display.init()
+        pygame.font.init()
         self.flags = pygame.DOUBLEBUF
         if Config.FULLSCREEN:
             self.flags |= pygame.FULLSCREEN
@@ -14,23 +24,62 @@ class Game:
         self.screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT), self.flags)
         pygame.display.set_caption(Config.TITLE)
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("arial", 24)
+        self.text = TextRenderer()
+        self.text.preload()
+        self.startup['display'] = self.elapsed_ms()
         self.state = Config.STATE_MENU
         self.running = True
         
         # Sistemas
         self.input_handler = InputHandler()
-        self.camera = Camera()
-        self.map_system = InfiniteMap()
-        self.particles = ParticleManager()
-        
-        # Entidades
-        self.projectiles = []
-        spawn_y = self.map_system.base_y - 60
-        self.player_blue = Player(0, spawn_y, self.particles, self.camera, char_type="BLUE")
-        self.player_blue.set_projectiles_list(self.projectiles)
-        self.player_red = None
-        self.active_player = self.player_blue
+        self.profiler = Profiler()
+        self.quality = QualityGovernor()  # Preset de qualidade ajustado pelo tempo de quadro
+        self.sim = None  # Criada em warm_up(), depois do primeiro quadro do menu
+        self.recorder = None
+        self.show_profiler = False
+
+        # Passo fixo: o tempo real acumula e é gasto em ticks de 1/SIM_HZ
+        self.sim_dt = 1.0 / Config.SIM_HZ
+        self.accumulator = 0.0
+        self.frame_dt = 0.0
+        self.prev_state = self.state
+        # Toques únicos (pulo/troca) ficam guardados até um tick consumi-los
+        self.latched_edges = {'jump': False, 'swap_char': False}
+        self.mouse_world = pygame.math.Vector2()  # Mira em coordenadas de mundo (reaproveitada)
+
+        # Apresentação: telas estáticas só repintam quando mudam e enviam só as regiões alteradas
+        self.painted = None      # Estado cuja tela estática está no display (None = repintar)
+        self.buttons = {}        # Rects dos botões da tela estática atual (cliques sem redesenhar)
+        self.dirty_rects = []    # Regiões alteradas neste quadro (display.update)
+        self.full_flip = False   # Quadro de jogo: a câmera mexe a tela inteira
+        self.framebuffer = None  # Superfície reduzida do mundo (RENDER_SCALE < 1)
+
+    @staticmethod
+    def elapsed_ms():
+        return (time.perf_counter() - STARTED) * 1000.0
+
+    def warm_up(self):
+        # Simulação (NumPy), mapa inicial e thread de prefetch só com o menu já na tela
+        from simulation import Simulation
+        from replay import ReplayRecorder
+        self.sim = Simulation(self.profiler, prefetch=True, seed=random.getrandbits(32))
+        self.recorder = ReplayRecorder(self.sim.seed, self.sim.map_system.seed, self.sim.batch is not None) if Config.REPLAY_RECORD else None
+        self.startup['warm_up'] = self.elapsed_ms()
+        # Fontes do sistema só agora; a tela estática é repintada com elas no próximo quadro
+        self.text.use_system_fonts()
+        self.painted = None
+        self.startup['fonts'] = self.elapsed_ms()
+
+    def startup_report(self):
+        """Etapas da partida a frio: ms de cada uma e o total desde o início do main.py."""
+        lines, prev = [], 0.0
+        for stage, ms in self.startup.items():
+            lines.append(f"{stage:<12} {ms - prev:7.1f} ms  (total {ms:7.1f} ms)")
+            prev = ms
+        first = self.startup['first_frame']
+        verdict = "dentro" if first <= Config.STARTUP_TARGET_MS else f"ESTOURADA em {first - Config.STARTUP_TARGET_MS:.1f} ms"
+        lines.append(f"meta do primeiro quadro: {Config.STARTUP_TARGET_MS} ms -> {verdict}")
+        return "\n".join(lines)
 
     def toggle_fullscreen(self):
         Config.FULLSCREEN = not Config.FULLSCREEN
@@ -38,25 +87,41 @@ class Game:
         if Config.FULLSCREEN:
             self.flags |= pygame.FULLSCREEN
         self.screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT), self.flags)
+        self.painted = None
+
+    def begin_static(self, state):
+        """True se a tela estática 'state' precisa ser repintada (e já a marca como inteira suja)."""
+        if self.painted == state: return False
+        self.painted = state
+        self.buttons.clear()
+        self.screen.fill(Config.COLOR_BG)
+        self.dirty_rects.append(self.screen.get_rect())
+        return True
+
+    def present(self):
+        if self.full_flip: pygame.display.flip()
+        elif self.dirty_rects: pygame.display.update(self.dirty_rects)
+        self.full_flip = False
+        self.dirty_rects.clear()
 
     def draw_button(self, text, y_offset, active=False):
         color = (255, 255, 255) if active else (150, 150, 150)
-        txt_surf = self.font.render(text, True, color)
+        txt_surf = self.text.render(text, 24, color)
         rect = txt_surf.get_rect(center=(Config.SCREEN_WIDTH//2, Config.SCREEN_HEIGHT//2 + y_offset))
         self.screen.blit(txt_surf, rect)
         return rect
 
     def run_menu(self):
-        self.screen.fill(Config.COLOR_BG)
-        title = pygame.font.SysFont("arial", 72, bold=True).render("DDNet Remake", True, Config.COLOR_PLAYER_BLUE)
-        self.screen.blit(title, title.get_rect(center=(Config.SCREEN_WIDTH//2, 200)))
+        if self.begin_static(Config.STATE_MENU):
+            title = self.text.render("DDNet Remake", 72, Config.COLOR_PLAYER_BLUE, bold=True)
+            self.screen.blit(title, title.get_rect(center=(Config.SCREEN_WIDTH//2, 200)))
+            self.buttons['play'] = self.draw_button("JOGAR", 50, active=True)
+            self.buttons['settings'] = self.draw_button("CONFIGURAÇÕES", 120)
+            self.buttons['exit'] = self.draw_button("SAIR", 190)
         
         mx, my = pygame.mouse.get_pos()
         click = pygame.mouse.get_pressed()[0]
-
-        btn_play = self.draw_button("JOGAR", 50, active=True)
-        btn_settings = self.draw_button("CONFIGURAÇÕES", 120)
-        btn_exit = self.draw_button("SAIR", 190)
+        btn_play, btn_settings, btn_exit = self.buttons['play'], self.buttons['settings'], self.buttons['exit']
 
         if btn_play.collidepoint(mx, my) and click:
             self.state = Config.STATE_GAME
@@ -68,16 +133,16 @@ class Game:
             self.running = False
 
     def run_settings(self):
-        self.screen.fill(Config.COLOR_BG)
-        label = self.font.render("CONFIGURAÇÕES", True, (255, 255, 255))
-        self.screen.blit(label, (50, 50))
+        if self.begin_static(Config.STATE_SETTINGS):
+            label = self.text.render("CONFIGURAÇÕES", 24, (255, 255, 255))
+            self.screen.blit(label, (50, 50))
+            fs_text = f"TELA CHEIA: {'LIGADO' if Config.FULLSCREEN else 'DESLIGADO'}"
+            self.buttons['fullscreen'] = self.draw_button(fs_text, 0)
+            self.buttons['back'] = self.draw_button("VOLTAR", 150)
 
         mx, my = pygame.mouse.get_pos()
         click = pygame.mouse.get_pressed()[0]
-
-        fs_text = f"TELA CHEIA: {'LIGADO' if Config.FULLSCREEN else 'DESLIGADO'}"
-        btn_fs = self.draw_button(fs_text, 0)
-        btn_back = self.draw_button("VOLTAR", 150)
+        btn_fs, btn_back = self.buttons['fullscreen'], self.buttons['back']
 
         if btn_fs.collidepoint(mx, my) and click:
             self.toggle_fullscreen()
@@ -86,63 +151,127 @@ class Game:
             self.state = Config.STATE_MENU
             pygame.time.delay(200)
 
-    def run_game(self):
-        actions = self.input_handler.process_events()
+    def toggle_profiler(self):
+        self.show_profiler = not self.show_profiler
+        self.profiler.enabled = self.show_profiler or self.profiler.export_file is not None
+        if not self.profiler.enabled: self.profiler.reset()
+
+    def toggle_profiler_export(self):
+        if self.profiler.export_file:
+            self.profiler.stop_export()
+        else:
+            self.profiler.start_export(Config.PROFILER_EXPORT_PATH)
+        self.profiler.enabled = self.show_profiler or self.profiler.export_file is not None
+
+    def draw_profiler_overlay(self):
+        # Tabela p50/p95/p99 (ms) por subsistema + contadores do mundo
+        rows = [("etapa (ms)", "p50", "p95", "p99")]
+        for name, values in self.profiler.summary().items():
+            rows.append((name,) + tuple(f"{v:.2f}" for v in values))
+        footer = ["  ".join(f"{k}: {v}" for k, v in self.profiler.counts.items()), f"qualidade: {self.quality.level}"]
+        if self.profiler.export_file: footer.append(f"gravando {Config.PROFILER_EXPORT_PATH} (F4)")
+
+        panel = pygame.Surface((420, 20 * (len(rows) + len(footer)) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        color = (220, 220, 220)
+        for i, row in enumerate(rows):
+            panel.blit(self.text.render(row[0], 16, color), (8, 5 + i * 20))
+            for j, cell in enumerate(row[1:]):
+                txt = self.text.render(cell, 16, color)
+                panel.blit(txt, txt.get_rect(topright=(230 + j * 80, 5 + i * 20)))
+        for i, line in enumerate(footer):
+            panel.blit(self.text.render(line, 16, color), (8, 5 + (len(rows) + i) * 20))
+        self.screen.blit(panel, (10, 10))
+
+    def run_game(self, dt):
+        with self.profiler.span("input"):
+            actions = self.input_handler.process_events()
         
         # Tecla ESC volta para o menu
         if pygame.key.get_pressed()[pygame.K_ESCAPE]:
             self.state = Config.STATE_MENU
             return
 
-        # Lógica de Troca de Personagem (X)
-        if actions['swap_char']:
-            if self.player_red is None:
-                spawn_pos = self.camera.to_world(actions['mouse_pos'])
-                self.player_red = Player(spawn_pos.x, spawn_pos.y, self.particles, self.camera, char_type="DUMMY")
-                self.player_red.set_projectiles_list(self.projectiles)
-                self.active_player = self.player_red
-                self.particles.emit((spawn_pos.x, spawn_pos.y), 20, Config.COLOR_PLAYER_RED, 5)
-            else:
-                self.active_player = self.player_red if self.active_player == self.player_blue else self.player_blue
-
-        self.map_system.update(self.active_player.pos.y)
-        players = [self.player_blue]
-        if self.player_red: players.append(self.player_red)
-        
-        for p in players:
-            p_actions = actions if p == self.active_player else {'left':False,'right':False,'jump':False,'hook':False,'shoot':False,'swap_char':False,'weapon1':False,'weapon2':False,'mouse_pos':(0,0)}
-            p.update(p_actions, self.map_system.walls, players)
-        
-        for proj in self.projectiles[:]:
-            proj.update(self.map_system.walls, players)
-            if not proj.active: self.projectiles.remove(proj)
-            
-        self.camera.update(self.active_player.pos)
-        self.particles.update()
+        for key in self.latched_edges:
+            if actions[key]: self.latched_edges[key] = True
 
-        # Renderização
-        self.screen.fill(Config.COLOR_BG)
-        self.map_system.draw(self.screen, self.camera)
-        for p in players: p.draw(self.screen, self.camera)
-        for proj in self.projectiles: proj.draw(self.screen, self.camera)
-        self.particles.draw(self.screen, self.camera)
+        self.accumulator += dt
+        steps = 0
+        while self.accumulator >= self.sim_dt and steps < Config.MAX_SUBSTEPS:
+            actions.update(self.latched_edges)
+            # A simulação só enxerga coordenadas de mundo
+            actions['mouse_world'] = self.sim.camera.to_world(actions['mouse_pos'], self.mouse_world)
+            if self.recorder: self.recorder.record(actions)
+            self.sim.step(actions)
+            for key in self.latched_edges: self.latched_edges[key] = False
+            self.accumulator -= self.sim_dt
+            steps += 1
+
+        # Atingiu o limite de ticks: descarta o atraso em vez de tentar alcançá-lo
+        if steps == Config.MAX_SUBSTEPS:
+            self.accumulator = min(self.accumulator, self.sim_dt)
+
+        # Renderização (interpolada entre os dois últimos ticks)
+        self.painted = None; self.full_flip = True
+        scale = Config.RENDER_SCALE
+        target = self.screen if scale == 1.0 else self.get_framebuffer(scale)
+        target.fill(Config.COLOR_BG)
+        self.sim.draw(target, self.accumulator / self.sim_dt, scale)
+        if target is not self.screen:
+            with self.profiler.span("upscale"):
+                upscale = pygame.transform.smoothscale if Config.RENDER_SMOOTH else pygame.transform.scale
+                upscale(target, self.screen.get_size(), self.screen)
+        # HUD por cima, na resolução da tela
+        if self.show_profiler: self.draw_profiler_overlay()
+
+    def get_framebuffer(self, scale):
+        size = (round(Config.SCREEN_WIDTH * scale), round(Config.SCREEN_HEIGHT * scale))
+        if self.framebuffer is None or self.framebuffer.get_size() != size:
+            self.framebuffer = pygame.Surface(size).convert(self.screen)
+        return self.framebuffer
 
     def main_loop(self):
         while self.running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT: self.running = False
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED): self.painted = None
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3: self.toggle_profiler()
+                    if event.key == pygame.K_F4: self.toggle_profiler_export()
             
             if self.state == Config.STATE_MENU:
                 self.run_menu()
             elif self.state == Config.STATE_SETTINGS:
                 self.run_settings()
             elif self.state == Config.STATE_GAME:
-                self.run_game()
+                # Ao entrar no jogo, ignora o tempo gasto no menu (roda um tick só)
+                self.run_game(self.frame_dt if self.prev_state == Config.STATE_GAME else self.sim_dt)
             
-            pygame.display.flip()
-            self.clock.tick(Config.FPS)
+            with self.profiler.span("flip"):
+                self.present()
+            if self.sim is None:
+                self.startup['first_frame'] = self.elapsed_ms()
+                self.warm_up()
+                if self.report_startup:
+                    print(self.startup_report())
+                    self.running = False
+            # Desligado, o profiler não paga nem a contagem do mundo
+            if self.state == Config.STATE_GAME and self.profiler.enabled:
+                self.profiler.end_frame(self.sim.counts())
+            was_playing = self.prev_state == Config.STATE_GAME == self.state
+            self.prev_state = self.state
+            self.frame_dt = self.clock.tick(Config.FPS) / 1000.0
+            # Só quadros de jogo seguidos contam (o primeiro depois do menu vem com a troca de tela)
+            if was_playing: self.quality.observe(self.clock.get_rawtime())
+        if self.sim: self.sim.map_system.close()
+        if self.recorder and self.recorder.ticks: self.recorder.save(Config.REPLAY_PATH, self.sim)
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
+    import argparse
+    parser = argparse.ArgumentParser(description=Config.TITLE)
+    parser.add_argument("--startup-report", action="store_true",
+                        help="mostra o tempo de cada etapa da partida a frio e sai depois do primeiro quadro")
+    args = parser.parse_args()
+    game = Game(report_startup=args.startup_report)
     game.main_loop()
\ No newline at end of file
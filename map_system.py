@@ -1,15 +1,281 @@
 import pygame
+import math
+import queue
 import random
+import threading
+import time
+from collections import OrderedDict
 from config import Config
 
+class TileChunk:
+    """
+    Faixa horizontal do mapa (CHUNK_HEIGHT pixels) guardada como bytearray:
+    1 byte por bloco, indexado por (coluna, linha). Cresce na horizontal sob demanda.
+    """
+    def __init__(self, row0, rows):
+        self.row0 = row0
+        self.rows = rows
+        self.col0 = 0
+        self.cols = 0
+        self.data = bytearray()
+        self.version = 0  # Incrementa a cada mudança (invalida superfícies cacheadas)
+
+    def reserve(self, col_min, col_max):
+        # Garante espaço para as colunas [col_min, col_max]
+        if self.cols and self.col0 <= col_min and col_max < self.col0 + self.cols:
+            return
+        if self.cols:
+            col_min = min(col_min, self.col0)
+            col_max = max(col_max, self.col0 + self.cols - 1)
+        cols = col_max - col_min + 1
+        data = bytearray(self.rows * cols)
+        shift = self.col0 - col_min
+        for r in range(self.rows):
+            src = r * self.cols
+            dst = r * cols + shift
+            data[dst:dst + self.cols] = self.data[src:src + self.cols]
+        self.col0, self.cols, self.data = col_min, cols, data
+
+    def merge_spans(self, col_start=None, col_end=None):
+        """
+        Junta os blocos sólidos em retângulos máximos (guloso): primeiro as corridas
+        horizontais de cada linha, depois corridas idênticas em linhas seguidas.
+        Retorna [col, linha, largura, altura] em blocos, limitado a [col_start, col_end).
+        """
+        c0 = self.col0 if col_start is None else max(col_start, self.col0)
+        c1 = self.col0 + self.cols if col_end is None else min(col_end, self.col0 + self.cols)
+        if c0 >= c1: return []  # Faixa fora do chunk (o find contaria um fim negativo a partir do final)
+        data = self.data
+        spans = []
+        open_spans = {}  # (início, fim) da corrida na linha anterior -> span que ainda pode crescer
+        for r in range(self.rows):
+            base = r * self.cols - self.col0
+            end = base + c1
+            next_open = {}
+            pos = data.find(1, base + c0, end)
+            while pos != -1:
+                stop = data.find(0, pos, end)
+                if stop == -1: stop = end
+                run = (pos - base, stop - base)
+                span = open_spans.get(run)
+                if span is not None:
+                    span[3] += 1
+                else:
+                    span = [run[0], self.row0 + r, run[1] - run[0], 1]
+                    spans.append(span)
+                next_open[run] = span
+                pos = data.find(1, stop, end) if stop < end else -1
+            open_spans = next_open
+        return spans
+
+    def count(self):
+        return self.data.count(1)
+
+    def solid_cells(self):
+        """(coluna, linha) de cada bloco sólido, linha a linha."""
+        data, cols = self.data, self.cols
+        pos = data.find(1)
+        while pos != -1:
+            r, c = divmod(pos, cols)
+            yield self.col0 + c, self.row0 + r
+            pos = data.find(1, pos + 1)
+
+    def get(self, col, row):
+        c = col - self.col0
+        if c < 0 or c >= self.cols: return 0
+        return self.data[(row - self.row0) * self.cols + c]
+
+    def set(self, col, row, value):
+        self.reserve(col, col)
+        self.data[(row - self.row0) * self.cols + (col - self.col0)] = value
+        self.version += 1
+
+class TileGrid:
+    """
+    Grade de ocupação do mapa, dividida em TileChunks de 'rows_per_chunk' linhas.
+    'origin_row' alinha as faixas com o chão, para cada chunk gerado cair num TileChunk só.
+    """
+    def __init__(self, tile_size, rows_per_chunk, origin_row=0):
+        self.tile_size = tile_size
+        self.rows_per_chunk = rows_per_chunk
+        self.origin_row = origin_row
+        self.chunks = {}
+
+    def chunk_index(self, row):
+        return (row - self.origin_row) // self.rows_per_chunk
+
+    def get_chunk(self, row, create=False):
+        idx = self.chunk_index(row)
+        chunk = self.chunks.get(idx)
+        if chunk is None and create:
+            chunk = TileChunk(self.origin_row + idx * self.rows_per_chunk, self.rows_per_chunk)
+            self.chunks[idx] = chunk
+        return chunk
+
+    def set_solid(self, col, row, value=1):
+        chunk = self.get_chunk(row, create=bool(value))
+        if chunk: chunk.set(col, row, value)
+
+    def solid_at(self, col, row):
+        chunk = self.chunks.get((row - self.origin_row) // self.rows_per_chunk)
+        return chunk is not None and chunk.get(col, row) != 0
+
+    def is_solid(self, x, y):
+        ts = self.tile_size
+        return self.solid_at(int(x // ts), int(y // ts))
+
+    def overlaps(self, rect):
+        """True se algum bloco sólido sobrepõe o AABB (bordas encostadas não contam, como em colliderect)."""
+        return self.sweep_aabb(rect, 1, 1) is not None
+
+    def sweep_aabb(self, rect, axis, direction):
+        """
+        Varre os blocos cobertos pelo AABB a partir da borda que avança no eixo (0 = X, 1 = Y).
+        Retorna a coordenada da face do primeiro bloco sólido encontrado, ou None.
+        """
+        ts = self.tile_size
+        col0, col1 = rect.left // ts, (rect.right - 1) // ts
+        row0, row1 = rect.top // ts, (rect.bottom - 1) // ts
+
+        if axis == 0:
+            cols = range(col0, col1 + 1) if direction > 0 else range(col1, col0 - 1, -1)
+            for col in cols:
+                for row in range(row0, row1 + 1):
+                    if self.solid_at(col, row):
+                        return col * ts if direction > 0 else (col + 1) * ts
+        else:
+            rows = range(row0, row1 + 1) if direction > 0 else range(row1, row0 - 1, -1)
+            for row in rows:
+                for col in range(col0, col1 + 1):
+                    if self.solid_at(col, row):
+                        return row * ts if direction > 0 else (row + 1) * ts
+        return None
+
+    def raycast(self, origin, direction, max_dist):
+        """
+        Travessia de grade (Amanatides-Woo): visita só os blocos que o raio cruza.
+        'direction' deve estar normalizada.
+        Retorna (distância, ponto_de_impacto, normal_da_face) ou None se não bater em nada.
+        """
+        ts = self.tile_size
+        ox, oy = origin
+        dx, dy = direction
+        col, row = int(ox // ts), int(oy // ts)
+
+        if self.solid_at(col, row):
+            # Começou dentro de um bloco: devolve a face oposta ao movimento
+            normal = (-1 if dx > 0 else 1, 0) if abs(dx) > abs(dy) else (0, -1 if dy > 0 else 1)
+            return 0.0, (ox, oy), normal
+
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        if dx != 0:
+            t_max_x = (((col + 1) * ts if dx > 0 else col * ts) - ox) / dx
+            t_delta_x = ts / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            t_max_y = (((row + 1) * ts if dy > 0 else row * ts) - oy) / dy
+            t_delta_y = ts / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        while True:
+            if t_max_x < t_max_y:
+                t = t_max_x
+                if t > max_dist: return None
+                col += step_x; t_max_x += t_delta_x
+                normal = (-step_x, 0)
+            else:
+                t = t_max_y
+                if t > max_dist: return None
+                row += step_y; t_max_y += t_delta_y
+                normal = (0, -step_y)
+            if self.solid_at(col, row):
+                return t, (ox + dx * t, oy + dy * t), normal
+
+    def line_of_sight(self, p1, p2):
+        """True se não houver bloco sólido entre os dois pontos."""
+        dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+        dist = math.hypot(dx, dy)
+        if dist == 0: return not self.is_solid(p1[0], p1[1])
+        return self.raycast(p1, (dx / dist, dy / dist), dist) is None
+
+class MapChunk:
+    """
+    Um chunk gerado do mapa: seu índice e a faixa correspondente da grade (TileChunk).
+    O chunk 0 é o chão; os chunks de terreno têm índices negativos, subindo (-1, -2, ...).
+    Os blocos ficam só no TileChunk (1 byte cada): colisão e desenho leem dele.
+    """
+    def __init__(self, index, tiles):
+        self.index = index
+        self.tiles = tiles
+
+class ChunkPrefetcher:
+    """
+    Gera chunks (e pré-renderiza suas superfícies) numa thread de trabalho, à frente do player.
+    A thread só constrói objetos novos; a publicação no mapa é feita em InfiniteMap.update,
+    na thread principal, de uma vez só por chunk.
+    """
+    def __init__(self, world_map, queue_size=Config.MAP_PREFETCH_QUEUE):
+        self.world_map = world_map
+        # Fila sem limite: o limite vale só para chunks novos (pending), então as pré-renderizações
+        # nunca bloqueiam a thread principal nem tomam o lugar dos pedidos
+        self.requests = queue.Queue()
+        self.queue_size = queue_size
+        self.results = queue.Queue()
+        self.pending = set()  # Índices pedidos e ainda não publicados
+        self.thread = threading.Thread(target=self._run, name="chunk-prefetch", daemon=True)
+        self.thread.start()
+
+    def request(self, index, focus_x):
+        if index in self.pending: return True
+        if len(self.pending) >= self.queue_size: return False
+        self.requests.put_nowait((index, focus_x, None))
+        self.pending.add(index)
+        return True
+
+    def request_bake(self, chunk, focus_x):
+        # Só pré-renderiza um chunk que já está publicado
+        self.requests.put_nowait((chunk.index, focus_x, chunk))
+
+    def finished(self):
+        done = []
+        while True:
+            try:
+                done.append(self.results.get_nowait())
+            except queue.Empty:
+                return done
+
+    def stop(self):
+        self.requests.put(None)
+        self.thread.join(timeout=1.0)
+
+    def _run(self):
+        world_map = self.world_map
+        while True:
+            job = self.requests.get()
+            if job is None: return
+            index, focus_x, chunk = job
+            if chunk is None: chunk = world_map.build_chunk(index)
+            baked = {}
+            for seg in world_map.segments_around(focus_x):
+                baked[seg] = world_map.bake_segment(chunk.tiles, seg, convert=False)
+                time.sleep(0)  # Devolve o GIL entre segmentos para não segurar o quadro
+            self.results.put((chunk, baked))
+
 class InfiniteMap:
-    def __init__(self):
+    def __init__(self, seed=None, prefetch=False):
         self.tile_size = 40
-        self.walls = [] 
+        # Semente do terreno: cada chunk é gerado de (seed, índice), então é sempre igual
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.chunks = {}  # índice -> MapChunk
         
         # Base do mapa (Chão)
         self.base_y = Config.SCREEN_HEIGHT - 40 
-        self.highest_point = self.base_y
+        self.grid = TileGrid(self.tile_size, Config.CHUNK_HEIGHT // self.tile_size, self.base_y // self.tile_size)
+        self.surface_cache = OrderedDict()  # (chunk, segmento) -> (versão, Surface), em ordem LRU
+        self.top_index = 0  # Chunk mais alto já gerado (cursor da geração)
         
         # Parâmetros do Triângulo/Funil
         self.center_x = 0
@@ -21,8 +287,45 @@ class InfiniteMap:
         for _ in range(5):
             self.generate_chunk()
 
+        self.prefetcher = None
+        if prefetch:
+            self.prefetcher = ChunkPrefetcher(self)
+            for chunk in self.chunks.values(): self.prefetcher.request_bake(chunk, self.center_x)
+
+    def close(self):
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
+
+    @property
+    def highest_point(self):
+        # Topo do terreno já gerado (y da borda de cima do chunk mais alto)
+        return self.chunk_top(self.top_index) if self.top_index < 0 else self.base_y
+
+    @property
+    def walls(self):
+        # Rects de 40x40 montados na hora a partir da grade (só contadores e ferramentas usam)
+        ts = self.tile_size
+        return [pygame.Rect(c * ts, r * ts, ts, ts) for chunk in self.chunks.values() for c, r in chunk.tiles.solid_cells()]
+
+    def wall_count(self):
+        return sum(chunk.tiles.count() for chunk in self.chunks.values())
+
+    def chunk_top(self, index):
+        return self.base_y + index * Config.CHUNK_HEIGHT
+
+    def chunk_index_at(self, y):
+        return self.grid.chunk_index(int(y // self.tile_size))
+
+    def new_chunk(self, index):
+        return MapChunk(index, TileChunk(self.grid.origin_row + index * self.grid.rows_per_chunk, self.grid.rows_per_chunk))
+
+    def add_tile(self, chunk, x, y):
+        chunk.tiles.set(x // self.tile_size, y // self.tile_size, 1)
+
     def generate_floor(self):
         # Cria o chão base sólido no centro
+        chunk = self.new_chunk(0)
         half_w = (self.base_width_blocks * self.tile_size) // 2
         
         # Gera chão de -half_w até +half_w
@@ -30,14 +333,69 @@ class InfiniteMap:
         end_x = self.center_x + half_w
         
         for x in range(start_x, end_x + self.tile_size, self.tile_size):
-            rect = pygame.Rect(x, self.base_y, self.tile_size, self.tile_size)
-            self.walls.append(rect)
+            self.add_tile(chunk, x, self.base_y)
+        self.commit_chunk(chunk)
+
+    def commit_chunk(self, chunk):
+        # Publica o chunk: grade e lista de chunks
+        self.chunks[chunk.index] = chunk
+        self.grid.chunks[chunk.index] = chunk.tiles
+        self.top_index = min(self.top_index, chunk.index)
+
+    def evict_chunk(self, index):
+        del self.chunks[index]
+        del self.grid.chunks[index]
+        # Superfícies do chunk descartado saem do cache junto
+        for key in [k for k in self.surface_cache if k[0] == index]:
+            del self.surface_cache[key]
+
+    def snapshot(self):
+        # Chunk publicado nunca muda (só é trocado inteiro): o snapshot guarda as referências
+        return (self.top_index, tuple(self.chunks.values()))
+
+    def restore(self, state):
+        top_index, chunks = state
+        keep = {chunk.index: chunk for chunk in chunks}
+        for index in [i for i, chunk in self.chunks.items() if keep.get(i) is not chunk]:
+            self.evict_chunk(index)
+        for index, chunk in keep.items():
+            if index not in self.chunks: self.commit_chunk(chunk)
+        self.top_index = top_index
+
+    def is_solid(self, x, y):
+        return self.grid.is_solid(x, y)
+
+    def solid_at(self, col, row):
+        return self.grid.solid_at(col, row)
+
+    def sweep_aabb(self, rect, axis, direction):
+        return self.grid.sweep_aabb(rect, axis, direction)
+
+    def raycast(self, origin, direction, max_dist):
+        return self.grid.raycast(origin, direction, max_dist)
+
+    def line_of_sight(self, p1, p2):
+        return self.grid.line_of_sight(p1, p2)
+
+    def overlaps(self, rect):
+        return self.grid.overlaps(rect)
+
+    def generate_chunk(self, index=None):
+        """Gera (ou regenera) o chunk 'index'; sem índice, gera o próximo acima do topo."""
+        if index is None: index = self.top_index - 1
+        self.commit_chunk(self.build_chunk(index))
 
-    def generate_chunk(self):
+    def build_chunk(self, index):
         # Gera paredes subindo e abrindo (Formato V)
-        chunk_height = Config.CHUNK_HEIGHT
-        start_y = self.highest_point
-        end_y = start_y - chunk_height
+        # Só depende de (seed, index): regenerar um chunk descartado dá exatamente o mesmo terreno
+        rng = random.Random(f"{self.seed}:{index}")
+        chunk = self.new_chunk(index)
+        start_y = self.chunk_top(index + 1)
+        end_y = self.chunk_top(index)
+        
+        # Reserva a grade com a largura da linha mais alta (a mais larga do chunk)
+        top_half_width = ((self.base_width_blocks * self.tile_size) // 2) + ((self.base_y - end_y) // 80) * self.tile_size
+        chunk.tiles.reserve((self.center_x - top_half_width) // self.tile_size - 1, (self.center_x + top_half_width) // self.tile_size)
         
         current_y = start_y
         
@@ -55,56 +413,160 @@ class InfiniteMap:
             
             # Parede Esquerda
             left_x = self.center_x - current_half_width - self.tile_size
-            self.walls.append(pygame.Rect(left_x, current_y, self.tile_size, self.tile_size))
+            self.add_tile(chunk, left_x, current_y)
             
             # Parede Direita
             right_x = self.center_x + current_half_width
-            self.walls.append(pygame.Rect(right_x, current_y, self.tile_size, self.tile_size))
+            self.add_tile(chunk, right_x, current_y)
             
             # --- PLATAFORMAS INTERNAS ---
             # Gera plataformas apenas DENTRO do triângulo
-            if random.random() < 0.25: # 25% de chance por linha
+            if rng.random() < 0.25: # 25% de chance por linha
                 # Define limites internos (com margem das paredes)
                 inner_left = left_x + self.tile_size * 2
                 inner_right = right_x - self.tile_size * 2
                 
                 if inner_right > inner_left:
                     # Tamanho da plataforma
-                    plat_w = random.randint(3, 6) * self.tile_size
+                    plat_w = rng.randint(3, 6) * self.tile_size
                     # Posição aleatória dentro do espaço disponível
-                    plat_x = random.randint(inner_left, max(inner_left, inner_right - plat_w))
+                    plat_x = rng.randint(inner_left, max(inner_left, inner_right - plat_w))
                     
                     # Evita criar plataformas coladas nas paredes
                     for i in range(0, plat_w, self.tile_size):
                         # Snap to grid
                         block_x = (plat_x + i) // self.tile_size * self.tile_size
                         if block_x + self.tile_size < right_x and block_x > left_x + self.tile_size:
-                            self.walls.append(pygame.Rect(block_x, current_y, self.tile_size, self.tile_size))
+                            self.add_tile(chunk, block_x, current_y)
 
-        self.highest_point = end_y
+        return chunk
 
-    def update(self, player_y):
-        # Gera mais mapa conforme sobe
-        if player_y < self.highest_point + 1000:
-            self.generate_chunk()
-            # NOTA: Desativei o cleanup agressivo para permitir cair até o chão
-            # Se quiser otimizar memória depois, podemos reativar com um threshold maior
-            self.cleanup_old_chunks(player_y)
+    def update(self, player_y, keep_ys=(), focus_x=0):
+        """
+        Garante o terreno em volta do player ativo e descarta o que ficou longe de todos.
+        'keep_ys' são as alturas dos outros players, cujo chão não pode sumir;
+        'focus_x' é onde a câmera está (para pré-renderizar os chunks buscados antes).
+        """
+        if self.prefetcher: self.collect_prefetched(player_y, keep_ys, focus_x)
+
+        # Gera mais mapa conforme sobe, ou regenera um chunk descartado se alguém cair de volta
+        # (no máximo um chunk por chamada, o mais próximo do player).
+        # Com o prefetch ligado isso só acontece se a thread não deu conta.
+        first = min(self.chunk_index_at(player_y - 1000), -1)
+        last = min(self.chunk_index_at(player_y + 1000), -1)
+        for index in sorted(range(first, last + 1), key=lambda i: abs(self.chunk_top(i) - player_y)):
+            if index not in self.chunks:
+                self.generate_chunk(index)
+                self.cleanup_old_chunks(player_y, keep_ys)
+                break
+
+    def collect_prefetched(self, player_y, keep_ys, focus_x):
+        prefetcher = self.prefetcher
+        committed = False
+        for chunk, baked in prefetcher.finished():
+            prefetcher.pending.discard(chunk.index)
+            if self.chunks.get(chunk.index) is not chunk:
+                if chunk.index in self.chunks: continue  # Já foi gerado na hora (fallback)
+                self.commit_chunk(chunk)
+                committed = True
+            for seg, surface in baked.items():
+                self.cache_segment(chunk.index, chunk.tiles.version, seg, surface)
+        if committed: self.cleanup_old_chunks(player_y, keep_ys)
 
-    def cleanup_old_chunks(self, player_y):
-        # Só deleta se estiver MUITO longe (tipo 5000 pixels pra baixo)
-        # Isso permite cair bastante sem o chão sumir
-        threshold = player_y + 5000 
-        # Mantém sempre o chão base (y >= base_y) para segurança
-        self.walls = [w for w in self.walls if w.y < threshold or w.y >= self.base_y]
+        # Pede os chunks que faltam dentro da distância de antecipação, do mais perto ao mais longe
+        first = min(self.chunk_index_at(player_y - Config.MAP_PREFETCH_DISTANCE), -1)
+        last = min(self.chunk_index_at(player_y + Config.MAP_PREFETCH_DISTANCE), -1)
+        for index in sorted(range(first, last + 1), key=lambda i: abs(self.chunk_top(i) - player_y)):
+            if index not in self.chunks and not prefetcher.request(index, focus_x):
+                break  # Limite de pedidos em andamento
+
+    def cleanup_old_chunks(self, player_y, keep_ys=()):
+        # Descarta chunks inteiros MUITO longe (MAP_EVICT_DISTANCE) de todos os players;
+        # se alguém voltar para lá, o chunk é regenerado igualzinho
+        # Mantém sempre o chão base (chunk 0) para segurança
+        ys = (player_y,) + tuple(keep_ys)
+        half = Config.CHUNK_HEIGHT // 2
+        for index in [i for i in self.chunks if i != 0]:
+            center = self.chunk_top(index) + half
+            if all(abs(center - y) > Config.MAP_EVICT_DISTANCE for y in ys):
+                self.evict_chunk(index)
 
     def draw(self, surface, camera):
-        view_rect = pygame.Rect(camera.offset.x, camera.offset.y, Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT)
-        view_rect.inflate_ip(200, 200) 
-        
-        for wall in self.walls:
-            if view_rect.colliderect(wall):
-                rect_screen = camera.apply_rect(wall)
-                pygame.draw.rect(surface, Config.COLOR_GROUND, rect_screen)
-                # Grama decorativa
-                pygame.draw.rect(surface, Config.COLOR_GRASS, (rect_screen.x, rect_screen.y, rect_screen.width, 4))
\ No newline at end of file
+        # Um blit por segmento de chunk visível (ver bake_segment)
+        ts = self.tile_size
+        seg_w = Config.CHUNK_SURFACE_WIDTH
+        left, top = camera.offset.x, camera.offset.y
+        scale = camera.scale
+
+        first_idx = self.grid.chunk_index(int(top // ts))
+        last_idx = self.grid.chunk_index(int((top + Config.SCREEN_HEIGHT) // ts))
+        first_seg = int(left // seg_w)
+        last_seg = int((left + Config.SCREEN_WIDTH) // seg_w)
+
+        for idx in range(first_idx, last_idx + 1):
+            chunk = self.grid.chunks.get(idx)
+            if chunk is None or not chunk.cols: continue
+            for seg in range(first_seg, last_seg + 1):
+                baked = self.get_segment_surface(idx, chunk, seg, scale)
+                if baked is not None:
+                    surface.blit(baked, (round((seg * seg_w - left) * scale), round((chunk.row0 * ts - top) * scale)))
+
+    def get_segment_surface(self, idx, chunk, seg, scale=1.0):
+        # Em escala menor, a cópia reduzida fica no mesmo cache, com a escala na chave
+        key = (idx, seg) if scale == 1.0 else (idx, seg, scale)
+        entry = self.surface_cache.get(key)
+        if entry is not None and entry[0] == chunk.version:
+            self.surface_cache.move_to_end(key)
+            return entry[1]
+
+        if scale == 1.0:
+            baked = self.bake_segment(chunk, seg)
+        else:
+            baked = self.get_segment_surface(idx, chunk, seg)
+            if baked is not None:
+                w, h = baked.get_size()
+                baked = pygame.transform.scale(baked, (round(w * scale), round(h * scale)))
+        self.cache_segment(idx, chunk.version, seg, baked, scale)
+        return baked
+
+    def cache_segment(self, idx, version, seg, baked, scale=1.0):
+        key = (idx, seg) if scale == 1.0 else (idx, seg, scale)
+        self.surface_cache[key] = (version, baked)
+        self.surface_cache.move_to_end(key)
+        while len(self.surface_cache) > Config.CHUNK_CACHE_SIZE:
+            self.surface_cache.popitem(last=False)
+
+    def segments_around(self, focus_x):
+        # Segmentos que cabem numa tela em volta de 'focus_x' (o que vale pré-renderizar)
+        seg_w = Config.CHUNK_SURFACE_WIDTH
+        return range(int((focus_x - Config.SCREEN_WIDTH) // seg_w), int((focus_x + Config.SCREEN_WIDTH) // seg_w) + 1)
+
+    def bake_segment(self, chunk, seg, convert=True):
+        """
+        Pré-renderiza um pedaço (CHUNK_SURFACE_WIDTH x CHUNK_HEIGHT) do chunk numa Surface.
+        Retorna None se o pedaço não tiver nenhum bloco.
+        """
+        ts = self.tile_size
+        cols_per_seg = Config.CHUNK_SURFACE_WIDTH // ts
+        col_start = max(seg * cols_per_seg, chunk.col0)
+        col_end = min((seg + 1) * cols_per_seg, chunk.col0 + chunk.cols)
+        if col_start >= col_end: return None
+
+        # Fundo em retângulos fundidos; a grama continua uma faixa por linha de blocos
+        spans = chunk.merge_spans(col_start, col_end)
+        if not spans: return None
+        baked = pygame.Surface((Config.CHUNK_SURFACE_WIDTH, chunk.rows * ts))
+        baked.fill((0, 0, 0))
+        baked.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        seg_col = seg * cols_per_seg
+        for col, row, w, h in spans:
+            x = (col - seg_col) * ts
+            y = (row - chunk.row0) * ts
+            pygame.draw.rect(baked, Config.COLOR_GROUND, (x, y, w * ts, h * ts))
+            # Grama decorativa
+            for k in range(h):
+                pygame.draw.rect(baked, Config.COLOR_GRASS, (x, y + k * ts, w * ts, 4))
+
+        if convert and baked is not None and pygame.display.get_surface() is not None:
+            baked = baked.convert()
+        return baked
\ No newline at end of file
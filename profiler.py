@@ -0,0 +1,96 @@
+import json
+import time
+from collections import deque
+from config import Config
+
+class _NullSpan:
+    """Span que não faz nada: é o que o profiler devolve quando está desligado."""
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    """
+    Medição de tempo por subsistema com spans nomeados:
+
+        with profiler.span("physics"): ...
+
+    Os tempos de cada quadro são somados por nome e, em end_frame(), vão para
+    ring buffers (últimos PROFILER_HISTORY quadros) usados nos percentis.
+    Desligado, span() só devolve NULL_SPAN, então pode ficar no código de produção.
+    """
+    def __init__(self, history=Config.PROFILER_HISTORY):
+        self.enabled = False
+        self.history = history
+        self.samples = {}   # nome -> deque de ms por quadro
+        self.current = {}   # nome -> segundos acumulados no quadro atual
+        self.counts = {}
+        self.frame = 0
+        self.export_file = None
+
+    def span(self, name):
+        if not self.enabled: return NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, seconds):
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_frame(self, counts=None):
+        """Fecha o quadro: guarda os tempos acumulados e exporta a linha JSONL, se ativo."""
+        if not self.enabled: return
+        self.frame += 1
+        frame_ms = {}
+        for name, seconds in self.current.items():
+            ms = seconds * 1000.0
+            frame_ms[name] = ms
+            buf = self.samples.get(name)
+            if buf is None:
+                buf = self.samples[name] = deque(maxlen=self.history)
+            buf.append(ms)
+        self.current.clear()
+        if counts: self.counts = counts
+
+        if self.export_file:
+            self.export_file.write(json.dumps({'frame': self.frame, 'ms': frame_ms, 'counts': self.counts}) + "\n")
+
+    def percentiles(self, name):
+        """Retorna (p50, p95, p99) em ms para o span 'name'."""
+        buf = self.samples.get(name)
+        if not buf: return (0.0, 0.0, 0.0)
+        ordered = sorted(buf)
+        last = len(ordered) - 1
+        return tuple(ordered[int(last * q)] for q in (0.50, 0.95, 0.99))
+
+    def summary(self):
+        return {name: self.percentiles(name) for name in self.samples}
+
+    def reset(self):
+        self.samples.clear()
+        self.current.clear()
+        self.frame = 0
+
+    def start_export(self, path):
+        self.stop_export()
+        self.export_file = open(path, "a", encoding="utf-8")
+
+    def stop_export(self):
+        if self.export_file:
+            self.export_file.close()
+            self.export_file = None
@@ -0,0 +1,60 @@
+from collections import deque
+from config import Config
+
+def apply_preset(name):
+    """Copia os botões do preset para a Config (é de lá que partículas, câmera e desenho leem)."""
+    for key, value in Config.QUALITY_PRESETS[name].items(): setattr(Config, key, value)
+
+class QualityGovernor:
+    """
+    Escolhe o preset de qualidade pelo tempo de trabalho dos quadros recentes (sem a espera
+    do limite de FPS), contra o orçamento de 1/FPS. Há histerese nos dois sentidos:
+    baixa quando a média passa de QUALITY_DOWNGRADE_AT do orçamento, mas só sobe depois de
+    QUALITY_UPGRADE_FRAMES quadros seguidos abaixo de QUALITY_UPGRADE_AT, e toda troca é
+    seguida de QUALITY_COOLDOWN quadros sem outra.
+    """
+    def __init__(self, level=Config.QUALITY, adaptive=Config.QUALITY_ADAPTIVE, budget_ms=1000.0 / Config.FPS):
+        self.adaptive = adaptive
+        self.budget_ms = budget_ms
+        self.samples = deque(maxlen=Config.QUALITY_WINDOW)
+        self.total = 0.0       # Soma das amostras da janela (média em O(1))
+        self.calm_frames = 0   # Quadros seguidos abaixo do limiar de subida
+        self.cooldown = 0
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = level
+        apply_preset(level)
+        self.samples.clear()
+        self.total = 0.0
+        self.calm_frames = 0
+        self.cooldown = Config.QUALITY_COOLDOWN
+
+    def step(self, direction):
+        # -1 = baixa um nível, +1 = sobe um; retorna True se mudou
+        i = Config.QUALITY_LEVELS.index(self.level) + direction
+        if not 0 <= i < len(Config.QUALITY_LEVELS): return False
+        self.set_level(Config.QUALITY_LEVELS[i])
+        return True
+
+    def observe(self, frame_ms):
+        """Registra o tempo de trabalho de um quadro (ms); retorna True se o preset mudou."""
+        if not self.adaptive: return False
+        samples = self.samples
+        if len(samples) == samples.maxlen: self.total -= samples[0]
+        samples.append(frame_ms)
+        self.total += frame_ms
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+        if len(samples) < samples.maxlen: return False
+
+        mean = self.total / len(samples)
+        if mean > self.budget_ms * Config.QUALITY_DOWNGRADE_AT:
+            return self.step(-1)
+        if mean < self.budget_ms * Config.QUALITY_UPGRADE_AT:
+            self.calm_frames += 1
+            if self.calm_frames >= Config.QUALITY_UPGRADE_FRAMES: return self.step(1)
+        else:
+            self.calm_frames = 0
+        return False
@@ -0,0 +1,179 @@
+import struct
+import time
+import zlib
+from config import Config
+from simulation import Simulation, make_input
+
+# Formato (.ddr):
+#   MAGIC, versão (1 byte), flags (1 byte, FLAG_*), varint semente, varint semente do mapa,
+#   crc32 do estado final (4 bytes),
+#   depois o corpo comprimido com zlib. O corpo é uma sequência de trechos em que a entrada não muda:
+#     varint ticks | varint botões (bits de BUTTONS, + NO_MOUSE) | zigzag dx | zigzag dy
+#   A mira vai em pixels inteiros de mundo, como delta em relação ao trecho anterior.
+MAGIC = b"DDRP"
+VERSION = 2
+FLAG_BATCH_PHYSICS = 1  # Gravado com a física em lote (ordem de atualização diferente)
+BUTTONS = ('left', 'right', 'jump', 'hook', 'shoot', 'swap_char', 'weapon1', 'weapon2')
+NO_MOUSE = 1 << len(BUTTONS)  # Tick sem mira ('mouse_world' None)
+
+def write_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, i):
+    """Lê um varint de 'data' a partir de 'i'; retorna (valor, próximo índice)."""
+    value = shift = 0
+    while True:
+        if i >= len(data): raise ValueError("replay truncado")
+        byte = data[i]; i += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80: return value, i
+        shift += 7
+
+def zigzag(n): return n * 2 if n >= 0 else -n * 2 - 1
+def unzigzag(n): return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+def state_digest(sim):
+    """crc32 do estado dos players e do tick: basta um float diferente para mudar."""
+    values = [sim.tick]
+    for p in sim.players: values += (p.pos.x, p.pos.y, p.vel.x, p.vel.y)
+    return zlib.crc32(struct.pack(f"<{len(values)}d", *values))
+
+class ReplayRecorder:
+    """
+    Grava a entrada de cada tick. record() é chamado com o dicionário que vai para
+    Simulation.step, antes do passo: ele arredonda a mira no próprio dicionário, para
+    que a simulação gravada veja exatamente o que o replay vai reproduzir.
+    """
+    def __init__(self, seed, map_seed, batch_physics=False):
+        self.seed = seed
+        self.map_seed = map_seed
+        self.batch_physics = batch_physics
+        self.body = bytearray()
+        self.ticks = 0
+        self.run = None        # (botões, x, y) do trecho aberto
+        self.run_ticks = 0
+        self.last_mouse = (0, 0)  # Mira do último trecho escrito (base do delta)
+
+    def record(self, actions):
+        buttons = 0
+        for bit, key in enumerate(BUTTONS):
+            if actions[key]: buttons |= 1 << bit
+        mouse = actions['mouse_world']
+        if mouse is None:
+            buttons |= NO_MOUSE
+            x, y = self.run[1:] if self.run else self.last_mouse
+        else:
+            x, y = round(mouse[0]), round(mouse[1])
+            actions['mouse_world'] = (x, y)
+        run = (buttons, x, y)
+        if run != self.run:
+            self.flush()
+            self.run = run
+        self.run_ticks += 1
+        self.ticks += 1
+
+    def flush(self):
+        if not self.run_ticks: return
+        buttons, x, y = self.run
+        write_varint(self.body, self.run_ticks)
+        write_varint(self.body, buttons)
+        if not buttons & NO_MOUSE:
+            write_varint(self.body, zigzag(x - self.last_mouse[0]))
+            write_varint(self.body, zigzag(y - self.last_mouse[1]))
+            self.last_mouse = (x, y)
+        self.run_ticks = 0
+
+    def to_bytes(self, sim=None):
+        """Fecha o trecho aberto e monta o arquivo; com 'sim', guarda o crc do estado final."""
+        self.flush()
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        header.append(FLAG_BATCH_PHYSICS if self.batch_physics else 0)
+        write_varint(header, self.seed)
+        write_varint(header, self.map_seed)
+        header += struct.pack("<I", state_digest(sim) if sim is not None else 0)
+        return bytes(header) + zlib.compress(bytes(self.body), 9)
+
+    def save(self, path, sim=None):
+        data = self.to_bytes(sim)
+        with open(path, "wb") as f: f.write(data)
+        return len(data)
+
+class Replay:
+    """Replay carregado: semente, crc esperado e os trechos (ticks, botões, mira)."""
+    def __init__(self, seed, map_seed, digest, runs, batch_physics=False):
+        self.seed = seed
+        self.map_seed = map_seed
+        self.batch_physics = batch_physics
+        self.digest = digest
+        self.runs = runs
+        self.ticks = sum(run[0] for run in runs)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC: raise ValueError("não é um arquivo de replay")
+        if data[4] != VERSION: raise ValueError(f"versão de replay {data[4]} não suportada")
+        flags = data[5]
+        seed, i = read_varint(data, 6)
+        map_seed, i = read_varint(data, i)
+        (digest,) = struct.unpack_from("<I", data, i)
+        body = zlib.decompress(data[i + 4:])
+
+        runs = []
+        i = mx = my = 0
+        while i < len(body):
+            ticks, i = read_varint(body, i)
+            buttons, i = read_varint(body, i)
+            if buttons & NO_MOUSE:
+                mouse = None
+            else:
+                dx, i = read_varint(body, i)
+                dy, i = read_varint(body, i)
+                mx += unzigzag(dx); my += unzigzag(dy)
+                mouse = (mx, my)
+            runs.append((ticks, buttons, mouse))
+        return cls(seed, map_seed, digest, runs, bool(flags & FLAG_BATCH_PHYSICS))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f: return cls.from_bytes(f.read())
+
+    def inputs(self):
+        """Gera a entrada de cada tick (o mesmo dicionário, atualizado no lugar)."""
+        actions = make_input()
+        for ticks, buttons, mouse in self.runs:
+            for bit, key in enumerate(BUTTONS): actions[key] = bool(buttons & (1 << bit))
+            actions['mouse_world'] = mouse
+            for _ in range(ticks): yield actions
+
+def play(replay, profiler=None):
+    """
+    Reconstrói a partida sem janela, o mais rápido possível.
+    Retorna (simulação, segundos gastos).
+    """
+    sim = Simulation(profiler, seed=replay.seed, batch_physics=replay.batch_physics)
+    if sim.map_system.seed != replay.map_seed:
+        raise ValueError("a semente do mapa não bate: replay gravado com outra versão da geração")
+    start = time.perf_counter()
+    for actions in replay.inputs(): sim.step(actions)
+    return sim, time.perf_counter() - start
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Reproduz um replay sem display e confere o estado final")
+    parser.add_argument("path", nargs="?", default=Config.REPLAY_PATH)
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    sim, elapsed = play(replay)
+    real_time = replay.ticks / Config.SIM_HZ
+    print(f"{replay.ticks} ticks ({real_time:.1f}s de jogo) em {elapsed:.2f}s "
+          f"= {real_time / elapsed if elapsed > 0 else float('inf'):.0f}x tempo real | {len(replay.runs)} trechos")
+    if replay.digest:
+        ok = state_digest(sim) == replay.digest
+        print("estado final: " + ("confere" if ok else "DIVERGIU"))
+        sys.exit(0 if ok else 1)
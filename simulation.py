@@ -0,0 +1,224 @@
+import random
+import time
+from collections import deque
+from types import MappingProxyType
+from config import Config
+from core import Camera
+from map_system import InfiniteMap
+from entities import Player, ProjectilePool, ParticleManager, EntityGrid, PhysicsBatch
+from profiler import Profiler
+
+# Entrada "parada" usada por quem não está sendo controlado (uma só, somente leitura)
+IDLE_INPUT = MappingProxyType({
+    'left': False, 'right': False, 'jump': False, 'swap_char': False,
+    'hook': False, 'shoot': False, 'weapon1': False, 'weapon2': False,
+    'mouse_world': None,
+})
+
+def make_input(**actions):
+    """Monta um dicionário de entrada completo a partir de IDLE_INPUT."""
+    inputs = dict(IDLE_INPUT)
+    inputs.update(actions)
+    return inputs
+
+class SnapshotRing:
+    """
+    Snapshots dos últimos 'capacity' ticks, em ordem (deque com maxlen: o mais velho sai sozinho).
+    Serve para rollback, recomeçar de um ponto recente e caçar dessincronização.
+    """
+    def __init__(self, capacity=Config.SNAPSHOT_HISTORY):
+        self.snapshots = deque(maxlen=capacity)
+
+    def __len__(self): return len(self.snapshots)
+
+    def push(self, snapshot):
+        self.snapshots.append(snapshot)
+
+    def get(self, tick):
+        """Snapshot do início do tick 'tick', ou None se já saiu do buffer (ou ainda não existe)."""
+        if not self.snapshots: return None
+        i = tick - self.snapshots[0][0]
+        return self.snapshots[i] if 0 <= i < len(self.snapshots) else None
+
+    def discard_after(self, tick):
+        # Depois de um rollback, o "futuro" guardado deixa de valer
+        while self.snapshots and self.snapshots[-1][0] > tick: self.snapshots.pop()
+
+class Simulation:
+    """
+    Dono do estado do jogo (mapa, players, projéteis, partículas) e do passo de simulação.
+    Não depende de display, fonte nem mouse: a entrada chega como dicionário,
+    com a mira já em coordenadas de mundo ('mouse_world').
+    """
+    def __init__(self, profiler=None, prefetch=False, batch_physics=Config.BATCH_PHYSICS, seed=None, history=0):
+        # Com 'seed', o 'random' global (e dele a semente do mapa) fica fixo: mesma entrada, mesma partida
+        if seed is not None: random.seed(seed)
+        self.seed = seed
+        self.profiler = profiler or Profiler()
+        self.camera = Camera()
+        self.render_camera = Camera()  # Câmera interpolada usada só no desenho
+        self.map_system = InfiniteMap(prefetch=prefetch)
+        self.particles = ParticleManager()
+        self.entities = EntityGrid()  # Broadphase das entidades, refeita a cada tick
+        # Física das paredes em lote (NumPy) quando houver players suficientes.
+        # Muda a ordem das etapas (ver update_players_batched) e, portanto, o resultado
+        self.batch = PhysicsBatch() if batch_physics else None
+        self.tick = 0
+        self.keep_ys = []      # Alturas dos outros players (reaproveitada a cada tick)
+        self.prev_ground = []  # on_ground antes da física em lote
+        # Snapshot de cada tick dos últimos 'history' ticks (0 = desligado)
+        self.history = SnapshotRing(history) if history else None
+
+        # Entidades
+        self.projectiles = ProjectilePool()
+        spawn_y = self.map_system.base_y - 60
+        self.player_blue = Player(0, spawn_y, self.particles, self.camera, char_type="BLUE")
+        self.player_blue.set_projectiles_list(self.projectiles)
+        self.player_red = None
+        self.active_player = self.player_blue
+        self.players = [self.player_blue]
+
+    def spawn_dummy(self, x, y):
+        self.player_red = Player(x, y, self.particles, self.camera, char_type="DUMMY")
+        self.player_red.set_projectiles_list(self.projectiles)
+        self.players.append(self.player_red)
+        self.particles.emit((x, y), 20, Config.COLOR_PLAYER_RED, 5)
+        return self.player_red
+
+    def step(self, actions):
+        # Guarda o estado anterior para a interpolação do desenho
+        for p in self.players: p.prev_pos.update(p.pos)
+        for proj in self.projectiles: proj.prev_pos.update(proj.pos)
+
+        # Lógica de Troca de Personagem (X)
+        if actions['swap_char']:
+            if self.player_red is None:
+                # Sem mira (entrada headless), o dummy nasce onde está o player ativo
+                spawn_pos = actions['mouse_world']
+                if spawn_pos is None: spawn_pos = self.active_player.pos
+                self.active_player = self.spawn_dummy(spawn_pos[0], spawn_pos[1])
+            else:
+                self.active_player = self.player_red if self.active_player == self.player_blue else self.player_blue
+
+        prof = self.profiler
+        with prof.span("map"):
+            active = self.active_player
+            keep_ys = self.keep_ys
+            keep_ys.clear()
+            for p in self.players:
+                if p is not active: keep_ys.append(p.pos.y)
+            self.map_system.update(active.pos.y, keep_ys, active.pos.x)
+
+        with prof.span("players"):
+            self.entities.rebuild(self.players)
+            if self.batch is not None and len(self.players) >= Config.BATCH_PHYSICS_MIN:
+                self.update_players_batched(actions)
+            else:
+                for p in self.players:
+                    p.update(actions if p == self.active_player else IDLE_INPUT, self.map_system, self.entities)
+
+        with prof.span("projectiles"):
+            self.projectiles.update(self.map_system, self.entities)
+
+        with prof.span("camera"):
+            self.camera.update(self.active_player.pos)
+        with prof.span("particles"):
+            self.particles.update()
+        self.tick += 1
+        if self.history is not None:
+            with prof.span("snapshot"):
+                self.history.push(self.snapshot())
+
+    def snapshot(self):
+        """
+        Estado completo no início do tick atual: tuplas de números, cópias só das partículas
+        vivas e referências ao que nunca é alterado no lugar (chunks do mapa, lista do laser).
+        """
+        return (self.tick, tuple(self.players), self.player_red, self.active_player,
+                tuple(p.snapshot() for p in self.players), self.projectiles.snapshot(),
+                self.particles.snapshot(), self.camera.snapshot(), self.map_system.snapshot(),
+                random.getstate())
+
+    def restore(self, state):
+        (self.tick, players, self.player_red, self.active_player, player_states,
+         projectiles, particles, camera, map_state, rng_state) = state
+        self.players[:] = players
+        for p, p_state in zip(players, player_states): p.restore(p_state)
+        self.projectiles.restore(projectiles)
+        self.particles.restore(particles)
+        self.camera.restore(camera)
+        self.map_system.restore(map_state)
+        random.setstate(rng_state)
+
+    def rollback(self, tick):
+        """Volta ao início de 'tick' usando o histórico; retorna False se ele já saiu do buffer."""
+        snapshot = self.history.get(tick) if self.history is not None else None
+        if snapshot is None: return False
+        self.restore(snapshot)
+        self.history.discard_after(tick)
+        return True
+
+    def update_players_batched(self, actions):
+        # Mesmas etapas de Player.update, mas em fases: ações de todos, física em lote, contatos
+        for p in self.players:
+            p.update_actions(actions if p == self.active_player else IDLE_INPUT, self.map_system, self.entities)
+        prev_ground = self.prev_ground
+        prev_ground.clear()
+        for p in self.players: prev_ground.append(p.on_ground)
+        self.batch.step(self.players, self.map_system)
+        for p in self.players: self.entities.move(p)
+        for p, was_on_ground in zip(self.players, prev_ground):
+            p.update_contacts(self.entities, was_on_ground)
+
+    def counts(self):
+        return {'walls': self.map_system.wall_count(),
+                'particles': self.particles.count, 'projectiles': len(self.projectiles), 'players': len(self.players)}
+
+    def draw(self, surface, alpha=1.0, scale=1.0):
+        """
+        Desenha o mundo interpolado entre o tick anterior e o atual (alpha em [0, 1]).
+        Com 'scale' < 1, 'surface' é um framebuffer reduzido que cobre a mesma área da tela.
+        """
+        prof = self.profiler
+        camera = self.render_camera
+        camera.interpolate(self.camera, alpha)
+        camera.scale = scale
+        with prof.span("draw_map"):
+            self.map_system.draw(surface, camera)
+        with prof.span("draw_players"):
+            for p in self.players: p.draw(surface, camera, alpha)
+        with prof.span("draw_projectiles"):
+            for proj in self.projectiles: proj.draw(surface, camera, alpha)
+        with prof.span("draw_particles"):
+            self.particles.draw(surface, camera)
+
+def run_headless(ticks, input_fn=None, seed=None):
+    """
+    Roda 'ticks' passos sem janela, o mais rápido possível.
+    'input_fn(sim)' devolve a entrada de cada tick (padrão: ninguém mexe).
+    Retorna a simulação e os ticks por segundo obtidos.
+    """
+    sim = Simulation(seed=seed)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.step(input_fn(sim) if input_fn else IDLE_INPUT)
+    elapsed = time.perf_counter() - start
+    return sim, ticks / elapsed if elapsed > 0 else float('inf')
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Simulação headless (sem display)")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Segura o jogador pulando para a direita com o gancho puxando para cima
+    def climb(sim):
+        p = sim.active_player
+        return make_input(right=True, jump=sim.tick % 30 == 0, hook=sim.tick % 60 < 40,
+                          mouse_world=(p.pos.x + 100, p.pos.y - 300))
+
+    sim, tps = run_headless(args.ticks, climb, args.seed)
+    counts = sim.counts()
+    print(f"{args.ticks} ticks a {tps:.0f} ticks/s | altura: {sim.map_system.base_y - sim.player_blue.pos.y:.0f}px "
+          f"| paredes: {counts['walls']} | partículas: {counts['particles']}")